@@ -14,6 +14,7 @@ from urllib.parse import quote_plus, urlparse, urlunparse
 
 # Import the new centralized configuration
 from . import config
+from .json_provider import OrjsonProvider
 
 # Dash Imports
 import dash
@@ -70,6 +71,7 @@ def wait_for_mongodb(mongo_uri, max_retries=30, retry_interval=2):
 def create_app():
     """Factory pattern for creating Flask app with integrated Dash app"""
     server = Flask(__name__) # Rename Flask instance to 'server'
+    server.json = OrjsonProvider(server)
     
     # --- Apply ProxyFix Middleware ---
     server.wsgi_app = ProxyFix(
@@ -160,6 +162,8 @@ def create_app():
                 # Consider if 'name' should be unique. If not, remove unique=True.
                 result = server.db.ethical_memes.create_index([('name', 1)], unique=True, name='name_unique_idx')
                 logger.info(f"Ensured index '{result}' on ethical_memes.name")
+                keywords_idx = server.db.ethical_memes.create_index([('keywords', 1)], name='keywords_idx')
+                logger.info(f"Ensured index '{keywords_idx}' on ethical_memes.keywords")
                 agreements_status_idx = server.db.agreements.create_index([('status', 1)], name='agreements_status_idx')
                 logger.info(f"Ensured index '{agreements_status_idx}' on agreements.status")
                 agreements_created_idx = server.db.agreements.create_index([('created_at', -1)], name='agreements_created_at_idx')
@@ -191,6 +195,10 @@ def create_app():
     # Register Physical Verification Blockchain (PVB) API
     register_pvb_api(server)
 
+    # Warm the prompt template cache so the first analysis request skips the disk read
+    from .modules.llm_interface import preload_prompt_templates
+    logger.info(f"Preloaded {preload_prompt_templates()} prompt template(s)")
+
     # --- Initialize Dash App AFTER blueprints --- 
     dash_app = dash.Dash(
         __name__, 
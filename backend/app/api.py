@@ -2,10 +2,11 @@
 
 import os
 from typing import Dict, Any, Optional, Tuple
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 import re # Import regex module for parsing
 import json # Import JSON module for parsing
 import logging # Import logging
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import ValidationError
 from bson import ObjectId
 
@@ -13,9 +14,13 @@ from bson import ObjectId
 from . import config
 
 # Corrected relative import
-from .modules.llm_interface import generate_response, perform_ethical_analysis, select_relevant_memes
+from .modules.llm_interface import (
+    fetch_pvb_context, generate_response, perform_ethical_analysis, select_relevant_memes, stream_response,
+    warm_up_analysis
+)
 # Corrected relative imports assuming db.py and models.py are in the same 'app' package
 from .db import get_all_memes_for_selection, store_welfare_event, DatabaseConnectionError
+from .modules.llm_cache import llm_cache
 from .modules.ai_welfare import analyze_ai_welfare
 from .modules.alignment import analyze_alignment
 from .modules.constraint_transparency import generate_constraint_transparency
@@ -31,6 +36,10 @@ api_bp = Blueprint('api', __name__, url_prefix='/api')
 logger = logging.getLogger(__name__)
 # Assuming basicConfig is called in app __init__ or wsgi.py
 
+# Line-anchored, case-insensitive R2 section delimiters (compiled once at import)
+_SUMMARY_DELIMITER_RE = re.compile(f"^{config.SUMMARY_DELIMITER}", re.IGNORECASE | re.MULTILINE)
+_JSON_DELIMITER_RE = re.compile(f"^{config.JSON_DELIMITER}", re.IGNORECASE | re.MULTILINE)
+
 # --- Helper Functions ---
 
 def load_ontology(filepath: str = config.ONTOLOGY_FILEPATH) -> Optional[str]:
@@ -108,8 +117,8 @@ def _parse_ethical_analysis(analysis_text: str) -> Tuple[str, Optional[Dict[str,
         normalized_text = analysis_text.replace('\\r\\n', '\\n').strip()
 
         # Find delimiters (case-insensitive)
-        summary_match = re.search(f"^{config.SUMMARY_DELIMITER}", normalized_text, re.IGNORECASE | re.MULTILINE)
-        json_match = re.search(f"^{config.JSON_DELIMITER}", normalized_text, re.IGNORECASE | re.MULTILINE)
+        summary_match = _SUMMARY_DELIMITER_RE.search(normalized_text)
+        json_match = _JSON_DELIMITER_RE.search(normalized_text)
 
         summary_start_index = -1
         json_start_index = -1
@@ -261,13 +270,13 @@ def _validate_analyze_request(data: Optional[Dict[str, Any]]) -> Tuple[Optional[
     if origin_model is not None:
         if not isinstance(origin_model, str) or not origin_model.strip():
              return {"error": "Optional 'origin_model' must be a non-empty string."}, 400
-        if origin_model not in config.ALL_MODELS:
+        if origin_model not in config.ALL_MODELS_SET:
              return {"error": f"Optional 'origin_model' must be one of the supported models: {', '.join(config.ALL_MODELS)}"}, 400
              
     if analysis_model is not None:
         if not isinstance(analysis_model, str) or not analysis_model.strip():
             return {"error": "Optional 'analysis_model' must be a non-empty string."}, 400
-        if analysis_model not in config.ALL_MODELS:
+        if analysis_model not in config.ALL_MODELS_SET:
             return {"error": f"Optional 'analysis_model' must be one of the supported models: {', '.join(config.ALL_MODELS)}"}, 400
             
     # Validate API keys (must be non-empty string if provided)
@@ -295,6 +304,25 @@ def _validate_analyze_request(data: Optional[Dict[str, Any]]) -> Tuple[Optional[
 
     return None, None # No error
 
+# Background workers for pipeline legs that don't depend on each other (DB reads/writes
+# overlapping with LLM round-trips). Each task runs inside its own app context.
+_PIPELINE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=config.ANALYSIS_PIPELINE_WORKERS, thread_name_prefix="analysis-pipeline"
+)
+
+def _fetch_memes_for_selection(app) -> list:
+    with app.app_context():
+        return get_all_memes_for_selection()
+
+def _persist_welfare_event(app, welfare_event: Dict[str, Any]) -> None:
+    with app.app_context():
+        try:
+            store_welfare_event(welfare_event)
+        except DatabaseConnectionError:
+            logger.info("Skipping welfare event persistence: database connection unavailable.")
+        except Exception as welfare_error:
+            logger.error(f"Failed to store welfare event: {welfare_error}", exc_info=True)
+
 def _process_analysis_request(
     prompt: str,
     r1_config: config.LLMConfigData,
@@ -325,6 +353,13 @@ def _process_analysis_request(
         "error": None
     }
 
+    app = current_app._get_current_object()
+    # The meme list, PVB verification data and R2 client/template setup don't depend on R1,
+    # so prepare them while R1 is being generated
+    memes_future = _PIPELINE_EXECUTOR.submit(_fetch_memes_for_selection, app)
+    pvb_future = _PIPELINE_EXECUTOR.submit(fetch_pvb_context, (data or {}).get('pvb_data_hash'))
+    _PIPELINE_EXECUTOR.submit(warm_up_analysis, r2_config.api_key, r2_config.model_name, r2_config.api_endpoint)
+
     try:
         # --- Generate Initial Response (R1) ---
         logger.info(f"Generating initial response (R1) with model: {r1_config.model_name}")
@@ -367,11 +402,10 @@ def _process_analysis_request(
                 "created_at": datetime.now(timezone.utc),
                 "updated_at": datetime.now(timezone.utc),
             }
-            store_welfare_event(welfare_event)
-        except DatabaseConnectionError:
-            logger.info("Skipping welfare event persistence: database connection unavailable.")
+            # Persisting (and PVB-anchoring) the event runs alongside meme selection and R2
+            _PIPELINE_EXECUTOR.submit(_persist_welfare_event, app, welfare_event)
         except Exception as welfare_error:
-            logger.error(f"Failed to store welfare event: {welfare_error}", exc_info=True)
+            logger.error(f"Failed to build welfare event: {welfare_error}", exc_info=True)
 
         if not initial_response:
             # Even if R1 fails/is blocked, we might still try R2 analysis
@@ -385,7 +419,7 @@ def _process_analysis_request(
         selected_memes_reasoning = None
         try:
             logger.info("Fetching memes for selection...")
-            available_memes = get_all_memes_for_selection()
+            available_memes = memes_future.result()
             if available_memes:
                 # Use R2/analysis config for the selector LLM call
                 meme_selection_result = select_relevant_memes(
@@ -424,7 +458,7 @@ def _process_analysis_request(
             analysis_model_name=r2_config.model_name,
             analysis_api_endpoint=r2_config.api_endpoint,
             selected_meme_names=selected_meme_names, # Pass selected memes to R2
-            pvb_data_hash=data.get('pvb_data_hash') # Pass pvb_data_hash to R2
+            pvb_context=pvb_future.result() # PVB data fetched alongside R1
         )
 
         # --- Process R2 Result ---
@@ -580,14 +614,17 @@ def health():
             "anthropic": "available" if has_anthropic_key else "unavailable",
             "gemini": "available" if has_gemini_key else "unavailable",
             "xai": "available" if has_xai_key else "unavailable"
-        }
+        },
+        "llm_cache": llm_cache.stats
     }), 200
 
+# Model list served by /api/models, in configured (dropdown) order; built once at import
+_AVAILABLE_MODELS = [model for model in config.ALL_MODELS if isinstance(model, str) and model]
+
 @api_bp.route('/models', methods=['GET'])
 def get_models():
     """Return the list of available models from config."""
-    valid_models = [model for model in config.ALL_MODELS if isinstance(model, str) and model]
-    return jsonify({"models": valid_models})
+    return jsonify({"models": _AVAILABLE_MODELS})
 
 @api_bp.route('/analyze', methods=['POST'])
 def analyze():
@@ -665,6 +702,53 @@ def analyze():
         logger.info(f"Successfully processed /analyze request.")
         return jsonify(result_payload), 200 
 
+@api_bp.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """Stream the initial response (R1) for a prompt as server-sent events."""
+    data = request.get_json() or {}
+
+    validation_error, status_code = _validate_analyze_request(data)
+    if validation_error:
+        logger.warning(f"analyze_stream: Request validation failed - {status_code}: {validation_error.get('error')}")
+        return jsonify(validation_error), status_code
+
+    r1_llm_config = config.get_llm_config(
+        requested_model=data.get('origin_model'),
+        form_api_key=data.get('origin_api_key'),
+        form_api_endpoint=data.get('origin_api_endpoint'),
+        default_model_env_var_name=config.DEFAULT_R1_MODEL_ENV_VAR,
+        default_fallback_model=config.FALLBACK_R1_MODEL,
+        is_analysis_config=False
+    )
+    if r1_llm_config.error:
+        logger.error(f"analyze_stream: R1 config error - {r1_llm_config.error}")
+        return jsonify({"error": f"Configuration error for R1 model: {r1_llm_config.error}"}), 400
+
+    def _events():
+        # A provider failure or an empty stream ends with an error event instead of done,
+        # so clients can tell an aborted response from a complete one.
+        received = False
+        try:
+            for chunk in stream_response(
+                prompt=data['prompt'],
+                api_key=r1_llm_config.api_key,
+                model_name=r1_llm_config.model_name,
+                api_endpoint=r1_llm_config.api_endpoint
+            ):
+                received = True
+                yield f"data: {json.dumps({'text': chunk})}\n\n"
+        except Exception:
+            # stream_response has already logged the provider error
+            yield f"event: error\ndata: {json.dumps({'error': 'The model stream failed before completing.'})}\n\n"
+            return
+        if not received:
+            logger.warning(f"analyze_stream: Model {r1_llm_config.model_name} returned an empty stream")
+            yield f"event: error\ndata: {json.dumps({'error': 'The model returned no content.'})}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
+
+    return Response(stream_with_context(_events()), mimetype='text/event-stream')
+
 @api_bp.route('/ontology', methods=['GET'])
 def get_ontology():
     """Return the ethical ontology markdown content."""
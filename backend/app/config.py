@@ -1,7 +1,9 @@
 import os
 from dotenv import load_dotenv
 import logging
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import List, Dict, Any, FrozenSet, Optional
 
 logger = logging.getLogger(__name__)
 load_dotenv() # Load .env file from project root or backend/
@@ -24,6 +26,32 @@ XAI_MODELS: List[str] = [
     "grok-2", "grok-3-mini", "grok-3"
 ]
 ALL_MODELS: List[str] = OPENAI_MODELS + GEMINI_MODELS + ANTHROPIC_MODELS + XAI_MODELS
+# The lists above keep display/fallback order; use this for O(1) membership checks
+ALL_MODELS_SET: FrozenSet[str] = frozenset(ALL_MODELS)
+
+# Context window (prompt + completion tokens) per model, used to reject or trim
+# oversized analysis prompts before they are sent
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4o": 128_000, "gpt-4-turbo": 128_000, "gpt-3.5-turbo": 16_385,
+    "gemini-1.5-pro-latest": 2_097_152, "gemini-1.5-flash-latest": 1_048_576, "gemini-1.0-pro": 32_760,
+    "gemini-2.5-pro": 1_048_576, "gemini-2.5-flash": 1_048_576,
+    "claude-3-opus-20240229": 200_000, "claude-3-sonnet-20240229": 200_000, "claude-3-haiku-20240307": 200_000,
+    "grok-2": 131_072, "grok-3-mini": 131_072, "grok-3": 131_072,
+}
+
+class ModelType(IntEnum):
+    """LLM provider families; values index per-provider handler tuples."""
+    OPENAI = 0
+    GEMINI = 1
+    ANTHROPIC = 2
+    XAI = 3
+
+MODEL_TYPE_MAP: Dict[str, ModelType] = {
+    **{model: ModelType.OPENAI for model in OPENAI_MODELS},
+    **{model: ModelType.GEMINI for model in GEMINI_MODELS},
+    **{model: ModelType.ANTHROPIC for model in ANTHROPIC_MODELS},
+    **{model: ModelType.XAI for model in XAI_MODELS},
+}
 
 # --- Default Model Configuration ---
 DEFAULT_R1_MODEL_ENV_VAR = "DEFAULT_LLM_MODEL"
@@ -89,6 +117,59 @@ DEFAULT_GEMINI_SAFETY_SETTINGS: List[Dict[str, str]] = [
     {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"}
 ]
 R2_MEME_CONTEXT_MAX_CHARS = int(os.getenv("R2_MEME_CONTEXT_MAX_CHARS", "5000")) # Increased default
+# Set to true in development to re-read prompt templates from disk on every request
+PROMPT_TEMPLATE_RELOAD = os.getenv("PROMPT_TEMPLATE_RELOAD", "false").lower() in ("1", "true")
+# In-process cache for identical LLM calls (disable with LLM_CACHE_ENABLED=false or a TTL of 0)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))
+
+# Client-side rate limits per provider as (requests/min, tokens/min); 0 disables a budget
+LLM_RATE_LIMITS: Dict[str, tuple] = {
+    "openai": (int(os.getenv("OPENAI_RPM", "0")), int(os.getenv("OPENAI_TPM", "0"))),
+    "gemini": (int(os.getenv("GEMINI_RPM", "0")), int(os.getenv("GEMINI_TPM", "0"))),
+    "claude": (int(os.getenv("ANTHROPIC_RPM", "0")), int(os.getenv("ANTHROPIC_TPM", "0"))),
+    "xai": (int(os.getenv("XAI_RPM", "0")), int(os.getenv("XAI_TPM", "0"))),
+}
+# Total attempts (including the first) for LLM calls failing with transient errors
+LLM_RETRY_MAX_ATTEMPTS = int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", "4"))
+# Worker threads for concurrent LLM calls issued through llm_interface.call_many
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "32"))
+# Worker threads used to overlap independent analysis pipeline steps (DB I/O vs. LLM calls)
+ANALYSIS_PIPELINE_WORKERS = int(os.getenv("ANALYSIS_PIPELINE_WORKERS", "8"))
+
+@dataclass(frozen=True)
+class LLMSettings:
+    """LLM call tunables, read from the environment once so hot paths never touch os.environ."""
+    anthropic_api_version: str
+    r2_meme_context_max_chars: int
+    default_max_tokens: int
+    analysis_max_tokens: int
+    # Meme selection: lexical pre-filter, selector model and the thresholds that skip or
+    # reroute the selector call (0 disables a threshold)
+    meme_prefilter_enabled: bool
+    meme_prefilter_top_k: int
+    meme_selector_model: str
+    meme_selector_fast_path_threshold: float
+    meme_selector_skip_threshold: int
+    meme_selector_tool_use_min_memes: int
+
+    @classmethod
+    def from_env(cls) -> "LLMSettings":
+        return cls(
+            anthropic_api_version=os.getenv(ANTHROPIC_API_VERSION_ENV) or DEFAULT_ANTHROPIC_VERSION,
+            r2_meme_context_max_chars=R2_MEME_CONTEXT_MAX_CHARS,
+            default_max_tokens=int(os.getenv("LLM_DEFAULT_MAX_TOKENS", "2048")),
+            analysis_max_tokens=int(os.getenv("LLM_ANALYSIS_MAX_TOKENS", "4096")),
+            meme_prefilter_enabled=os.getenv("MEME_PREFILTER_ENABLED", "true").lower() in ("1", "true", "yes"),
+            meme_prefilter_top_k=int(os.getenv("MEME_PREFILTER_TOP_K", "50")),
+            meme_selector_model=os.getenv("MEME_SELECTOR_MODEL", "claude-3-haiku-20240307"),
+            meme_selector_fast_path_threshold=float(os.getenv("MEME_SELECTOR_FAST_PATH_THRESHOLD", "0.5")),
+            meme_selector_skip_threshold=int(os.getenv("MEME_SELECTOR_SKIP_THRESHOLD", "5")),
+            meme_selector_tool_use_min_memes=int(os.getenv("MEME_SELECTOR_TOOL_USE_MIN_MEMES", "30")),
+        )
+
+LLM_SETTINGS = LLMSettings.from_env()
 
 # --- R2 Analysis Parsing Delimiters (fallback) ---
 SUMMARY_DELIMITER = "SUMMARY:"
@@ -152,14 +233,14 @@ def get_llm_config(
     model_source_info = "user_form_model"
 
     # 1. Determine Model Name
-    if not final_model or final_model not in ALL_MODELS:
+    if not final_model or final_model not in ALL_MODELS_SET:
         env_model_name = os.getenv(default_model_env_var_name)
         if env_model_name and isinstance(env_model_name, str):
             env_model_name = env_model_name.strip().strip('"\'')
-        if env_model_name in ALL_MODELS:
+        if env_model_name in ALL_MODELS_SET:
             final_model = env_model_name
             model_source_info = f"env_var_for_model ({default_model_env_var_name})"
-        elif default_fallback_model and default_fallback_model in ALL_MODELS:
+        elif default_fallback_model and default_fallback_model in ALL_MODELS_SET:
             final_model = default_fallback_model
             model_source_info = "hardcoded_fallback_model"
             logger.warning(f"Requested model '{requested_model}' invalid, and default env model from '{default_model_env_var_name}' ('{env_model_name}') is invalid or not set. Using hardcoded fallback: {final_model}")
@@ -181,22 +262,23 @@ def get_llm_config(
     specific_analysis_key_env, specific_analysis_endpoint_env = None, None # For analysis-specific vars
     api_provider_name = "UnknownProvider"
 
-    if final_model in OPENAI_MODELS:
+    model_type = MODEL_TYPE_MAP.get(final_model)
+    if model_type is ModelType.OPENAI:
         api_provider_name = "OpenAI"
         provider_key_env, provider_endpoint_env = OPENAI_API_KEY_ENV, OPENAI_API_ENDPOINT_ENV
         if is_analysis_config:
             specific_analysis_key_env, specific_analysis_endpoint_env = ANALYSIS_OPENAI_API_KEY_ENV, ANALYSIS_OPENAI_API_ENDPOINT_ENV
-    elif final_model in GEMINI_MODELS:
+    elif model_type is ModelType.GEMINI:
         api_provider_name = "Gemini"
         provider_key_env, provider_endpoint_env = GEMINI_API_KEY_ENV, GEMINI_API_ENDPOINT_ENV
         if is_analysis_config:
             specific_analysis_key_env, specific_analysis_endpoint_env = ANALYSIS_GEMINI_API_KEY_ENV, ANALYSIS_GEMINI_API_ENDPOINT_ENV
-    elif final_model in ANTHROPIC_MODELS:
+    elif model_type is ModelType.ANTHROPIC:
         api_provider_name = "Anthropic"
         provider_key_env, provider_endpoint_env = ANTHROPIC_API_KEY_ENV, ANTHROPIC_API_ENDPOINT_ENV
         if is_analysis_config:
             specific_analysis_key_env, specific_analysis_endpoint_env = ANALYSIS_ANTHROPIC_API_KEY_ENV, ANALYSIS_ANTHROPIC_API_ENDPOINT_ENV
-    elif final_model in XAI_MODELS:
+    elif model_type is ModelType.XAI:
         api_provider_name = "xAI"
         provider_key_env, provider_endpoint_env = XAI_API_KEY_ENV, XAI_API_ENDPOINT_ENV
         if is_analysis_config:
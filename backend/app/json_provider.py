@@ -0,0 +1,38 @@
+"""orjson-backed JSON provider for the Flask server."""
+
+from typing import Any, Union
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serializes ``jsonify`` responses and parses request bodies with orjson.
+
+    Output matches Flask's default provider: keys are sorted, dates fall back to
+    Flask's HTTP-date formatting and other unsupported types go through the same
+    ``default`` hook. Calls that pass stdlib ``json`` keyword arguments are
+    delegated to the default provider.
+    """
+
+    def _dump_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        option = orjson.OPT_SORT_KEYS if self.sort_keys else 0
+        option |= orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._dump_bytes(obj).decode("utf-8")
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dump_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
@@ -2,20 +2,23 @@
 API routes for Ethical Memes CRUD operations
 """
 
+import functools
 import logging
 from datetime import datetime, timezone
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app
 from bson import ObjectId
 from bson.errors import InvalidId
-from pydantic import ValidationError, TypeAdapter
+from pydantic import ValidationError
 import os
 # import io # Unused
 # import csv # Unused
 import json
+import orjson
 # import base64 # Unused
 from werkzeug.utils import secure_filename
-from typing import List, Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 # Import the new centralized configuration
 from . import config
@@ -34,9 +37,6 @@ logger = logging.getLogger(__name__)
 # --- Blueprint Definition ---
 memes_bp = Blueprint('memes_api', __name__, url_prefix='/api/memes')
 
-# Pydantic TypeAdapter for validating a list of memes
-EthicalMemeListValidator = TypeAdapter(List[EthicalMemeCreate])
-
 # --- Helper Function for parsing datetime from ISODate string ---
 def parse_datetime(iso_str):
     """Parses ISO 8601 string (with Z) to datetime object."""
@@ -48,6 +48,42 @@ def parse_datetime(iso_str):
         logger.warning(f"Could not parse datetime string: {iso_str}")
         return datetime.now(timezone.utc) # Fallback or raise error
 
+# --- Helper for serializing raw MongoDB documents ---
+def _bson_default(obj):
+    """orjson fallback for BSON types; ObjectIds are rendered as hex strings like the Pydantic models do."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+# Stored field names of EthicalMemeInDB: reads project to these so internal DB keys are not
+# exposed, and missing optional fields get the model defaults the validated path produced.
+_MEME_FIELDS = {field.alias or name: field for name, field in EthicalMemeInDB.model_fields.items()}
+_MEME_PROJECTION = dict.fromkeys(_MEME_FIELDS, 1)
+_MEME_REQUIRED_FIELDS = tuple(key for key, field in _MEME_FIELDS.items() if field.is_required())
+_MEME_DEFAULT_FIELDS = tuple((key, field) for key, field in _MEME_FIELDS.items() if not field.is_required())
+
+def _fill_meme_defaults(meme_doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Fills model defaults into a projected meme document in place.
+
+    Returns None if a required field is missing, so callers can skip the document like a
+    failed EthicalMemeInDB validation. Field types are not re-checked; they are validated on write.
+    """
+    if any(key not in meme_doc for key in _MEME_REQUIRED_FIELDS):
+        return None
+    for key, field in _MEME_DEFAULT_FIELDS:
+        if key not in meme_doc:
+            meme_doc[key] = field.get_default(call_default_factory=True)
+    return meme_doc
+
+def _json_response(payload, status=200):
+    """Serializes raw MongoDB documents straight to a JSON response, skipping model validation."""
+    return Response(orjson.dumps(payload, default=_bson_default), status=status, mimetype='application/json')
+
+def _model_json_response(model, status=200):
+    """Serializes a Pydantic model to JSON bytes with its core serializer (no intermediate dict or str)."""
+    body = model.__pydantic_serializer__.to_json(model, by_alias=True)
+    return Response(body, status=status, mimetype='application/json')
+
 # --- CRUD Routes ---
 
 @memes_bp.route('/', methods=['POST'])
@@ -85,8 +121,7 @@ def create_meme():
         
         # Validate and structure the response using Pydantic
         response_meme = EthicalMemeInDB(**new_meme_doc)
-        # Pydantic v2 uses model_dump_json for direct JSON string output
-        return response_meme.model_dump_json(by_alias=True), 201, {'Content-Type': 'application/json'}
+        return _model_json_response(response_meme, status=201)
     
     except Exception as e:
         logger.error(f"Error creating meme: {e}", exc_info=True)
@@ -98,33 +133,19 @@ def get_memes():
     if current_app.db is None:
         return jsonify({"error": "Database connection not available"}), 503
 
-    processed_count = 0
-    successful_count = 0
-    memes_list = []
     try:
-        memes_cursor = current_app.db.ethical_memes.find()
-        
-        for meme in memes_cursor:
-            processed_count += 1
-            meme_id_str = str(meme.get('_id', 'UNKNOWN_ID'))
-            try:
-                # Validate using Pydantic v2 model
-                validated_meme_obj = EthicalMemeInDB(**meme)
-                # Dump to JSON string (handles ObjectId), then load back to dict
-                meme_json_str = validated_meme_obj.model_dump_json(by_alias=True)
-                memes_list.append(json.loads(meme_json_str))
-                successful_count += 1
-            except ValidationError as e:
-                logger.warning(f"VALIDATION_ERROR skipping meme _id={meme_id_str}: {e.errors()}")
-            except Exception as inner_e:
-                # Log ANY other exception during processing of a single meme
-                logger.error(f"UNEXPECTED_PROCESSING_ERROR for meme _id={meme_id_str}: {inner_e}", exc_info=True)
-        
-        logger.info(f"Processed {processed_count} memes, successfully validated/serialized {successful_count} for API response.")
-        return jsonify(memes_list), 200
+        # Read-only path: documents were validated on write, so stream them straight from BSON to JSON
+        memes_list = []
+        for meme_doc in current_app.db.ethical_memes.find({}, _MEME_PROJECTION):
+            if _fill_meme_defaults(meme_doc) is None:
+                logger.warning(f"Skipping meme _id={meme_doc.get('_id')}: missing required fields")
+                continue
+            memes_list.append(meme_doc)
+        logger.info(f"Retrieved {len(memes_list)} memes for API response.")
+        return _json_response(memes_list)
         
     except Exception as e:
-        logger.error(f"Error retrieving memes (outer try block): {e}", exc_info=True)
+        logger.error(f"Error retrieving memes: {e}", exc_info=True)
         return jsonify({"error": f"Internal server error retrieving memes: {str(e)}"}), 500
 
 @memes_bp.route('/<meme_id>', methods=['GET'])
@@ -139,23 +160,15 @@ def get_meme(meme_id):
         except InvalidId:
             return jsonify({"error": f"Invalid meme ID format: {meme_id}"}), 400
             
-        meme_doc = current_app.db.ethical_memes.find_one({"_id": obj_id})
+        meme_doc = current_app.db.ethical_memes.find_one({"_id": obj_id}, _MEME_PROJECTION)
         
         if meme_doc is None:
              return jsonify({"error": f"Meme with ID {meme_id} not found"}), 404
-             
-        # Validate with Pydantic model
-        try:
-            validated_meme_obj = EthicalMemeInDB(**meme_doc)
-            # Dump to JSON string (handles ObjectId), then load back to dict
-            meme_json_str = validated_meme_obj.model_dump_json(by_alias=True)
-            return jsonify(json.loads(meme_json_str)), 200
-        except ValidationError as e:
-            logger.error(f"Error validating meme {meme_id} from DB: {e.errors()}")
+        if _fill_meme_defaults(meme_doc) is None:
+            logger.error(f"Meme {meme_id} from DB is missing required fields")
             return jsonify({"error": f"Internal server error validating meme data for {meme_id}"}), 500
-        except Exception as inner_e:
-             logger.error(f"Unexpected error processing meme {meme_id}: {inner_e}", exc_info=True)
-             return jsonify({"error": f"Unexpected error processing meme {meme_id}"}), 500
+             
+        return _json_response(meme_doc)
              
     except Exception as e:
         logger.error(f"Error retrieving meme {meme_id}: {e}", exc_info=True)
@@ -207,7 +220,7 @@ def update_meme(meme_id):
         # Fetch and return the updated document, validated by Pydantic
         updated_meme_doc = current_app.db.ethical_memes.find_one({"_id": obj_id})
         response_meme = EthicalMemeInDB(**updated_meme_doc)
-        return response_meme.model_dump_json(by_alias=True), 200, {'Content-Type': 'application/json'}
+        return _model_json_response(response_meme)
 
     except ValidationError as e: # Catch validation error on returning the updated doc
         logger.error(f"Error validating updated meme {meme_id} from DB: {e.errors()}")
@@ -359,19 +372,19 @@ def upload_memes():
         elif file_extension.lower() == '.json':
             logger.info(f"Attempting direct JSON parsing for '{filename}'")
             try:
-                # Assume a JSON array of objects or JSON lines
-                try:
-                    # Try parsing as a single JSON array first
-                    records_to_process = json.loads(content_string)
-                    if not isinstance(records_to_process, list):
-                         raise ValueError("JSON file is not a list of objects.")
-                except (json.JSONDecodeError, ValueError):
-                    # Try parsing as JSON Lines (objects separated by newlines)
+                # Peek at the first non-whitespace character to pick the format up front,
+                # rather than attempting a whole-buffer parse that fails for JSON Lines files.
+                stripped_content = content_string.lstrip()
+                if stripped_content.startswith('['):
+                    # A single JSON array of objects
+                    records_to_process = orjson.loads(stripped_content)
+                else:
+                    # JSON Lines (objects separated by newlines)
                     records_to_process = []
-                    for line in content_string.strip().split('\n'):
+                    for line in stripped_content.split('\n'):
                         if line.strip():
-                             try: records_to_process.append(json.loads(line))
-                             except json.JSONDecodeError:
+                             try: records_to_process.append(orjson.loads(line))
+                             except orjson.JSONDecodeError:
                                   logger.warning(f"Skipping invalid JSON line in {filename}: {line[:100]}...")
                                   validation_errors.append({"record_index": len(records_to_process), "record_name": "N/A (JSON Line)", "errors": "Invalid JSON format"})
                 processed_count = len(records_to_process)
@@ -391,6 +404,7 @@ def upload_memes():
             logger.info(f"Validating {len(records_to_process)} parsed/extracted records...")
             now = datetime.now(timezone.utc)
             validated_memes_for_insert = []
+            original_indices = []  # Upload position of each validated meme, for error reporting
             
             for i, record_data in enumerate(records_to_process):
                 record_name = record_data.get("name", f"Record {i+1}") # Get name for error reporting
@@ -401,6 +415,7 @@ def upload_memes():
                     # Add metadata before potential insertion
                     meme_doc['metadata'] = {'created_at': now, 'updated_at': now, 'version': 1}
                     validated_memes_for_insert.append(meme_doc)
+                    original_indices.append(i)
                 except ValidationError as e:
                     logger.warning(f"Validation failed for record index {i} (Name: '{record_name}'): {e.errors()}")
                     validation_errors.append({"record_index": i, "record_name": record_name, "errors": e.errors()})
@@ -415,10 +430,28 @@ def upload_memes():
                     insert_result = current_app.db.ethical_memes.insert_many(validated_memes_for_insert, ordered=False)
                     inserted_count = len(insert_result.inserted_ids)
                     logger.info(f"Successfully inserted {inserted_count} memes from file '{filename}'.")
-                except Exception as db_err: # Catch potential bulk write errors
+                except BulkWriteError as bwe:
+                    # With ordered=False every non-conflicting record is still inserted; the unique
+                    # name index rejects duplicates, which are reported back as validation errors.
+                    details = bwe.details or {}
+                    inserted_count = details.get('nInserted', 0)
+                    write_errors = details.get('writeErrors', [])
+                    non_duplicate_errors = [err for err in write_errors if err.get('code') != 11000]
+                    for err in write_errors:
+                        if err.get('code') != 11000:
+                            continue
+                        failed_doc = validated_memes_for_insert[err.get('index', 0)]
+                        validation_errors.append({
+                            "record_index": original_indices[err.get('index', 0)],
+                            "record_name": failed_doc.get('name'),
+                            "errors": "Duplicate meme name; a meme with this name already exists."
+                        })
+                    logger.info(f"Inserted {inserted_count} memes from file '{filename}'; {len(write_errors) - len(non_duplicate_errors)} duplicates skipped.")
+                    if non_duplicate_errors:
+                        logger.error(f"Non-duplicate write errors during bulk insert from file '{filename}': {non_duplicate_errors}")
+                        return jsonify({"error": "Database error during bulk insert. Some records may not have been saved."}), 500
+                except Exception as db_err: # Catch other database errors
                     logger.error(f"Error during bulk insert from file '{filename}': {db_err}", exc_info=True)
-                    # Note: Some records might have been inserted before the error if ordered=False
-                    # For simplicity, report a general DB error. More complex handling could check BulkWriteError details.
                     return jsonify({"error": "Database error during bulk insert. Some records may not have been saved."}), 500
             else:
                 logger.warning(f"No valid memes found to insert from file '{filename}' after validation.")
@@ -440,36 +473,30 @@ def upload_memes():
         "llm_feedback": llm_feedback
     }), 200 
 
-# --- New Route for Mass Population ---
-@memes_bp.route('/populate', methods=['POST'])
-def populate_memes():
-    """Populates the database with predefined memes, checking for existence first."""
-    if current_app.db is None:
-         return jsonify({"error": "Database connection not available"}), 503
-    
-    memes_collection = current_app.db.ethical_memes
-    inserted_count = 0
-    skipped_count = 0
-    errors = []
+# --- Seed data for mass population ---
+@functools.lru_cache(maxsize=1)
+def _load_seed_documents(filepath: str) -> Tuple[Tuple[Optional[str], Optional[Dict[str, Any]]], ...]:
+    """Parses and normalizes the predefined meme seed file once per process.
 
-    try:
-        # Load meme data from external file
-        with open(config.MEMES_JSON_FILEPATH, 'r', encoding='utf-8-sig') as f:
-            # Use json_util.loads to handle MongoDB extended JSON like {"$date": ...} if present
-            # If memes.json uses standard ISO dates, json.load(f) is fine and Pydantic handles parsing.
-            # Assuming memes.json might have $date, use json_util
-            from bson import json_util
-            predefined_memes_raw = json_util.loads(f.read())
-        logger.info(f"Loaded {len(predefined_memes_raw)} memes from {config.MEMES_JSON_FILEPATH}")
-    except Exception as e:
-        logger.error(f"Error loading memes from {config.MEMES_JSON_FILEPATH}: {e}", exc_info=True)
-        return jsonify({"error": f"Failed to load meme data file: {e}"}), 500
+    Returns (name, document) pairs; memes without a name are kept with a None document so
+    they are still reported as skipped. Timestamps the seed file does not supply are left
+    unset here and stamped per insert by _stamp_seed_document. Load errors propagate and are not cached.
+    """
+    with open(filepath, 'rb') as f:
+        # Parse with orjson (strip a UTF-8 BOM if present). Extended JSON {"$date": ...}
+        # wrappers are left as dicts and normalized by the metadata pass below.
+        predefined_memes_raw = orjson.loads(f.read().removeprefix(b'\xef\xbb\xbf'))
+    logger.info(f"Loaded {len(predefined_memes_raw)} memes from {filepath}")
 
     # Ensure that datetime parsing logic is robust. Pydantic models should handle ISO strings.
-    # If converting from {"$date": ...} to datetime objects:
-    now = datetime.now(timezone.utc)
-    processed_memes = []
+    # If converting from {"$date": ...} to datetime objects; unparseable values are dropped
+    # so they fall back to the insert time.
+    seed_documents = []
     for meme_data in predefined_memes_raw:
+        name = meme_data.get("name")
+        if not name:
+            seed_documents.append((None, None))
+            continue
         if 'metadata' in meme_data and isinstance(meme_data['metadata'], dict):
             for date_field in ['created_at', 'updated_at']:
                 if date_field in meme_data['metadata']:
@@ -477,63 +504,110 @@ def populate_memes():
                         try:
                             # bson.json_util.loads already converts $date to datetime
                             # If it's still a dict here, it means it wasn't standard BSON $date
-                            # For safety, attempt parsing if it's a string, else use `now`
+                            # For safety, attempt parsing if it's a string, else use the insert time
                             if isinstance(meme_data['metadata'][date_field]['$date'], str):
                                  meme_data['metadata'][date_field] = parse_datetime(meme_data['metadata'][date_field]['$date'])
-                            else: # if $date value is not string, log warning and use now
-                                logger.warning(f"Unexpected $date format for {date_field} in meme {meme_data.get('name')}, using current time.")
-                                meme_data['metadata'][date_field] = now
+                            else: # if $date value is not string, log warning and use the insert time
+                                logger.warning(f"Unexpected $date format for {date_field} in meme {meme_data.get('name')}, using insert time.")
+                                del meme_data['metadata'][date_field]
                         except ValueError as ve:
-                            logger.warning(f"Could not parse date string {meme_data['metadata'][date_field]} for {date_field} in meme {meme_data.get('name')}: {ve}. Using current time.")
-                            meme_data['metadata'][date_field] = now
+                            logger.warning(f"Could not parse date string {meme_data['metadata'][date_field]} for {date_field} in meme {meme_data.get('name')}: {ve}. Using insert time.")
+                            del meme_data['metadata'][date_field]
                     elif isinstance(meme_data['metadata'][date_field], str): # Already an ISO string
                         try:
                             meme_data['metadata'][date_field] = parse_datetime(meme_data['metadata'][date_field])
                         except ValueError:
-                             meme_data['metadata'][date_field] = now # Fallback
+                             del meme_data['metadata'][date_field] # Fallback to insert time
                     else: # Not a dict with $date, not a string
-                        meme_data['metadata'][date_field] = now
+                        del meme_data['metadata'][date_field]
         else: # No metadata block
-            meme_data['metadata'] = {'created_at': now, 'updated_at': now, 'version': 1}
-        processed_memes.append(meme_data)
-    predefined_memes = processed_memes # Use the list with parsed dates
+            meme_data['metadata'] = {'version': 1}
+
+        # The seed file is a trusted source: build the model without running validators
+        # (defaults are still filled in). User-supplied data goes through model_validate.
+        seed_meme = EthicalMemeCreate.model_construct(**meme_data)
+        # EthicalMemeCreate has no aliases and no nested models, so __dict__ is BSON-ready.
+        meme_doc = seed_meme.__dict__.copy()
+        # Metadata is excluded from EthicalMemeCreate; attach the normalized block from the seed file
+        meme_doc['metadata'] = meme_data['metadata']
+        seed_documents.append((name, meme_doc))
+    return tuple(seed_documents)
+
+def _stamp_seed_document(seed_doc: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Returns an insertable copy of a cached seed document with missing timestamps set to `now`.
+
+    The copy also keeps pymongo from adding `_id` to the cached document.
+    """
+    metadata = {'created_at': now, 'updated_at': now, **seed_doc['metadata']}
+    return {**seed_doc, 'metadata': metadata}
 
+def _has_unique_name_index(collection) -> bool:
+    """True if the collection has the unique index on `name` (created best-effort at startup)."""
     try:
-        for meme_data in predefined_memes:
-            name = meme_data.get("name")
-            if not name:
-                logger.warning("Skipping predefined meme with no name.")
-                skipped_count += 1
-                continue
+        indexes = collection.index_information()
+    except Exception as e:
+        logger.warning(f"Could not read meme collection indexes: {e}")
+        return False
+    return any(info.get('unique') and list(info.get('key', [])) == [('name', 1)] for info in indexes.values())
 
-            # Check if a meme with the same name already exists
-            existing_meme = memes_collection.find_one({"name": name})
-            if existing_meme:
-                logger.info(f"Meme '{name}' already exists. Skipping.")
-                skipped_count += 1
-                continue
+# --- New Route for Mass Population ---
+@memes_bp.route('/populate', methods=['POST'])
+def populate_memes():
+    """Populates the database with predefined memes, checking for existence first."""
+    if current_app.db is None:
+         return jsonify({"error": "Database connection not available"}), 503
+    
+    memes_collection = current_app.db.ethical_memes
+    inserted_count = 0
+    skipped_count = 0
+    errors = []
 
+    try:
+        seed_documents = _load_seed_documents(config.MEMES_JSON_FILEPATH)
+    except Exception as e:
+        logger.error(f"Error loading memes from {config.MEMES_JSON_FILEPATH}: {e}", exc_info=True)
+        return jsonify({"error": f"Failed to load meme data file: {e}"}), 500
+
+    try:
+        named_documents = [(name, seed_doc) for name, seed_doc in seed_documents if name]
+        skipped_count = len(seed_documents) - len(named_documents)
+        if skipped_count:
+            logger.warning(f"Skipping {skipped_count} predefined memes with no name.")
+
+        if named_documents and not _has_unique_name_index(memes_collection):
+            # Without the unique index duplicates would be inserted silently, so filter out
+            # existing names (and repeats within the seed file) with a single $in query.
+            seen = {doc['name'] for doc in memes_collection.find(
+                {'name': {'$in': [name for name, _ in named_documents]}}, {'name': 1})}
+            new_documents = []
+            for name, seed_doc in named_documents:
+                if name in seen:
+                    logger.info(f"Meme '{name}' already exists. Skipping.")
+                    skipped_count += 1
+                    continue
+                seen.add(name)
+                new_documents.append((name, seed_doc))
+            named_documents = new_documents
+
+        if named_documents:
+            # One unordered bulk insert; the unique name index rejects memes that already exist,
+            # replacing a find_one existence check per meme.
             try:
-                # Validate with Pydantic before inserting
-                validated_meme = EthicalMemeCreate(**meme_data)
-                meme_doc_to_insert = validated_meme.model_dump(by_alias=True)
-                # Re-add metadata as it might not be part of EthicalMemeCreate
-                meme_doc_to_insert['metadata'] = meme_data['metadata']
-                
-                # Insert the new meme
-                result = memes_collection.insert_one(meme_doc_to_insert)
-                if result.inserted_id:
-                    inserted_count += 1
-                    logger.debug(f"Inserted meme '{name}' with ID: {result.inserted_id}")
-                else:
-                    errors.append(f"Failed to insert meme '{name}'.")
-                    
-            except ValidationError as e:
-                logger.warning(f"Validation failed for predefined meme '{name}': {e.errors()}")
-                errors.append(f"Validation failed for '{name}': {e.errors()}")
-            except Exception as insert_err:
-                logger.error(f"Error processing or inserting predefined meme '{name}': {insert_err}", exc_info=True)
-                errors.append(f"Error processing '{name}'. See server logs for details.")
+                now = datetime.now(timezone.utc)
+                memes_collection.insert_many([_stamp_seed_document(seed_doc, now) for _, seed_doc in named_documents], ordered=False)
+                inserted_count = len(named_documents)
+            except BulkWriteError as bwe:
+                details = bwe.details or {}
+                inserted_count = details.get('nInserted', 0)
+                for err in details.get('writeErrors', []):
+                    name = named_documents[err.get('index', 0)][0]
+                    if err.get('code') == 11000:
+                        logger.info(f"Meme '{name}' already exists. Skipping.")
+                        skipped_count += 1
+                    else:
+                        logger.error(f"Error inserting predefined meme '{name}': {err.get('errmsg')}")
+                        errors.append(f"Error processing '{name}'. See server logs for details.")
+            logger.debug(f"Inserted {inserted_count} predefined memes")
 
         status_code = 200 if not errors else 207 # Multi-status if errors occurred
         return jsonify({
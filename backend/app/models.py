@@ -1,56 +1,105 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any, Union, Literal, Annotated
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, PlainSerializer, WithJsonSchema, create_model
+from typing import List, Optional, Dict, Any, Literal, Annotated, Tuple
 from datetime import datetime, timezone
+from functools import partial
+from typing_extensions import NotRequired, TypedDict
 from bson import ObjectId
-
-# Helper for ObjectId validation/serialization compatible with Pydantic v2
-# Pydantic v2 handles ObjectId directly better with arbitrary_types_allowed
-# but this custom type ensures validation and schema representation.
-PyObjectId = Annotated[ObjectId, Field(validate_default=False)]
+from pydantic_core import PydanticCustomError
+
+# Helper for ObjectId validation/serialization compatible with Pydantic v2.
+# Hex strings are converted by a before-validator and ObjectIds are rendered as strings
+# in JSON output by a serializer resolved at schema build time (no json_encoders needed).
+def _to_oid(value: Any) -> Any:
+    """Converts a hex string to an ObjectId; other values are passed through for validation."""
+    if isinstance(value, str):
+        if not ObjectId.is_valid(value):
+            # PydanticCustomError keeps errors() JSON-serializable (a ValueError lands in ctx as an object)
+            raise PydanticCustomError('object_id', "'{value}' is not a valid ObjectId", {'value': value})
+        return ObjectId(value)
+    return value
+
+PyObjectId = Annotated[
+    ObjectId,
+    BeforeValidator(_to_oid),
+    PlainSerializer(str, return_type=str, when_used='json'),
+    WithJsonSchema({"type": "string", "description": "MongoDB ObjectId as a 24-character hex string"}),
+]
+
+# List of ObjectIds that also accepts hex strings, without a per-element Union validator
+ObjectIdList = List[PyObjectId]
 
 # --- Model for Meme Selection LLM Output ---
 class MemeSelectionResponse(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     selected_memes: List[str] = Field(description="List of names of the most relevant ethical memes.")
     reasoning: Optional[str] = Field(default=None, description="Explanation for why these memes were selected.")
 
 # --- Sub-models for Dimension Specific Attributes ---
-
-class DeontologyAttributes(BaseModel):
-    is_rule_based: Optional[bool] = None
-    universalizability_test: Optional[str] = None
-    respects_rational_agents: Optional[bool] = None
-    focus_on_intent: Optional[bool] = None
-
-class TeleologyAttributes(BaseModel):
-    focus: Optional[str] = None
-    utility_metric: Optional[str] = None
-    scope: Optional[str] = None
-    time_horizon: Optional[str] = None
-
-class VirtueEthicsAttributes(BaseModel):
-    related_virtues: Optional[List[str]] = Field(default_factory=list)
-    related_vices: Optional[List[str]] = Field(default_factory=list)
-    role_of_phronesis: Optional[Literal["High", "Medium", "Low"]] = None
-    contributes_to_eudaimonia: Optional[bool] = None
-
-class MemeticsAttributes(BaseModel):
-    estimated_transmissibility: Optional[Literal["Very High", "High", "Medium", "Low", "Very Low"]] = None
-    estimated_persistence: Optional[Literal["Very High", "High", "Medium", "Low", "Very Low"]] = None
-    estimated_adaptability: Optional[Literal["Very High", "High", "Medium", "Low", "Very Low"]] = None
-    fidelity_level: Optional[Literal["High", "Medium", "Low"]] = None
-    common_transmission_pathways: Optional[List[str]] = Field(default_factory=list)
-    relevant_selection_pressures: Optional[List[str]] = Field(default_factory=list)
-
-class DimensionSpecificAttributes(BaseModel):
-    deontology: Optional[DeontologyAttributes] = None
-    teleology: Optional[TeleologyAttributes] = None
-    virtue_ethics: Optional[VirtueEthicsAttributes] = None
-    memetics: Optional[MemeticsAttributes] = None
+# These are TypedDicts rather than BaseModels: pydantic-core validates them with its
+# dedicated typed-dict validator (no model __init__ per nested block) and the validated
+# value is already a plain dict that can be written to MongoDB as-is.
+# A meme may carry attributes for several dimensions at once, so the blocks stay keyed
+# by dimension rather than being a single tagged union.
+
+# Shared rating scales, defined once so each use references the same type
+Level5 = Literal["Very High", "High", "Medium", "Low", "Very Low"]
+Level3 = Literal["High", "Medium", "Low"]
+
+class DeontologyAttributes(TypedDict, total=False):
+    is_rule_based: Optional[bool]
+    universalizability_test: Optional[str]
+    respects_rational_agents: Optional[bool]
+    focus_on_intent: Optional[bool]
+
+class TeleologyAttributes(TypedDict, total=False):
+    focus: Optional[str]
+    utility_metric: Optional[str]
+    scope: Optional[str]
+    time_horizon: Optional[str]
+
+class VirtueEthicsAttributes(TypedDict, total=False):
+    related_virtues: Optional[List[str]]
+    related_vices: Optional[List[str]]
+    role_of_phronesis: Optional[Level3]
+    contributes_to_eudaimonia: Optional[bool]
+
+class MemeticsAttributes(TypedDict, total=False):
+    estimated_transmissibility: Optional[Level5]
+    estimated_persistence: Optional[Level5]
+    estimated_adaptability: Optional[Level5]
+    fidelity_level: Optional[Level3]
+    common_transmission_pathways: Optional[List[str]]
+    relevant_selection_pressures: Optional[List[str]]
+
+class DimensionSpecificAttributes(TypedDict, total=False):
+    deontology: Optional[DeontologyAttributes]
+    teleology: Optional[TeleologyAttributes]
+    virtue_ethics: Optional[VirtueEthicsAttributes]
+    memetics: Optional[MemeticsAttributes]
+
+# --- Relationship shapes stored on a meme ---
+
+class Morphism(TypedDict):
+    type: str
+    target_meme_id: PyObjectId
+    description: NotRequired[str]
+
+class CrossCategoryMapping(TypedDict):
+    target_concept: str
+    target_category: str
+    mapping_type: str
 
 # --- Metadata Model ---
+
+# Timezone-aware "now" without a Python-level lambda frame per default
+_utcnow = partial(datetime.now, timezone.utc)
+
 class MemeMetadata(BaseModel):
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    model_config = ConfigDict(defer_build=True)
+
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
     version: int = 1
 
 # --- Main Ethical Meme Model ---
@@ -62,19 +111,23 @@ class EthicalMemeBase(BaseModel):
     keywords: List[str] = Field(default_factory=list)
     variations: List[str] = Field(default_factory=list)
     examples: List[str] = Field(default_factory=list)
-    related_memes: List[Union[PyObjectId, str]] = Field(default_factory=list)
+    related_memes: ObjectIdList = Field(default_factory=list)
     dimension_specific_attributes: Optional[DimensionSpecificAttributes] = None
-    morphisms: Optional[List[Dict[str, Union[str, PyObjectId]]]] = Field(default_factory=list, description="Relationships (morphisms) to other memes. E.g., {'type': 'Universalizes', 'target_meme_id': '...', 'description': '...'}")
-    cross_category_mappings: Optional[List[Dict[str, str]]] = Field(default_factory=list, description="Mappings across ethical categories. E.g., {'target_concept': 'Net Benefit', 'target_category': 'Teleology', 'mapping_type': 'Functorial Analogy'}")
+    morphisms: Optional[List[Morphism]] = Field(default_factory=list, description="Relationships (morphisms) to other memes. E.g., {'type': 'Universalizes', 'target_meme_id': '...', 'description': '...'}")
+    cross_category_mappings: Optional[List[CrossCategoryMapping]] = Field(default_factory=list, description="Mappings across ethical categories. E.g., {'target_concept': 'Net Benefit', 'target_category': 'Teleology', 'mapping_type': 'Functorial Analogy'}")
     is_merged_token: Optional[bool] = Field(default=False, description="Indicates if this meme represents a merged concept from others.")
-    merged_from_tokens: Optional[List[PyObjectId]] = Field(default_factory=list, description="List of ObjectIds of the memes this token merges.")
+    merged_from_tokens: Optional[ObjectIdList] = Field(default_factory=list, description="List of ObjectIds of the memes this token merges.")
     metadata: MemeMetadata
 
-    model_config = {
-        "populate_by_name": True,
-        "arbitrary_types_allowed": True, # Needed for ObjectId
-        "json_encoders": {ObjectId: str} # Used by model_dump_json
-    }
+    # defer_build: core validators/serializers are built on first use rather than at import
+    # frozen: instances are never mutated after validation; use model_copy(update=...) instead
+    model_config = ConfigDict(
+        defer_build=True,
+        frozen=True,
+        extra="ignore",
+        populate_by_name=True,
+        arbitrary_types_allowed=True # Needed for ObjectId
+    )
 
 # Create model: Inherits base
 class EthicalMemeCreate(EthicalMemeBase):
@@ -83,45 +136,35 @@ class EthicalMemeCreate(EthicalMemeBase):
     pass
 
 # Update model: All fields should be optional
-class EthicalMemeUpdate(BaseModel):
-    # Make all fields from Base optional, exclude metadata as it's handled separately
-    name: Optional[str] = None
-    description: Optional[str] = None
-    ethical_dimension: Optional[List[str]] = None
-    source_concept: Optional[str] = None
-    keywords: Optional[List[str]] = None
-    variations: Optional[List[str]] = None
-    examples: Optional[List[str]] = None
-    related_memes: Optional[List[Union[PyObjectId, str]]] = None
-    dimension_specific_attributes: Optional[DimensionSpecificAttributes] = None
-    morphisms: Optional[List[Dict[str, Union[str, PyObjectId]]]] = None
-    cross_category_mappings: Optional[List[Dict[str, str]]] = None
-    is_merged_token: Optional[bool] = None
-    merged_from_tokens: Optional[List[PyObjectId]] = None
-    # metadata is not directly updatable via this model
-
-    model_config = {
-        "arbitrary_types_allowed": True,
-        "json_encoders": {ObjectId: str}
+def _make_partial(model: type[BaseModel], model_name: str, exclude: frozenset = frozenset()) -> type[BaseModel]:
+    """Builds a model with every field of `model` made Optional and defaulting to None."""
+    fields = {
+        name: (Optional[field.annotation], None)
+        for name, field in model.model_fields.items()
+        if name not in exclude
     }
+    return create_model(model_name, __config__=model.model_config, **fields)
+
+# Generated from the base so the field list cannot drift; metadata is not directly updatable
+EthicalMemeUpdate = _make_partial(EthicalMemeBase, "EthicalMemeUpdate", exclude=frozenset({"metadata"}))
 
 # DB model: Represents data fetched from DB including _id
 class EthicalMemeInDB(EthicalMemeBase):
     # Use Field with alias for '_id'
     id: PyObjectId = Field(alias="_id")
+    # Read-only after fetch: homogeneous tuples are cheaper to validate and hold than lists
+    ethical_dimension: Tuple[str, ...]
+    keywords: Tuple[str, ...] = ()
+    variations: Tuple[str, ...] = ()
+    examples: Tuple[str, ...] = ()
 
     # Inherits model_config from Base, including metadata handling
-    # No need to redefine model_config unless overriding Base
-
-    model_config = {
-        "populate_by_name": True,
-        "arbitrary_types_allowed": True,
-        "json_encoders": {ObjectId: str}
-    }
 
 # --- Pydantic models for R2 analysis output validation ---
 
 class ScoreEntry(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     score: int
     justification: str
 
@@ -129,9 +172,10 @@ class AnalysisResultModel(BaseModel):
     summary_text: str
     scores_json: Dict[str, ScoreEntry]
 
-    model_config = {
-        "extra": "ignore"  # ignore any additional keys
-    }
+    model_config = ConfigDict(
+        defer_build=True,
+        extra="ignore"  # ignore any additional keys
+    )
 
 # --- Agreements ---
 
@@ -140,6 +184,8 @@ AgreementActionType = Literal["accept", "decline", "counter", "comment", "reaffi
 
 
 class AgreementCreate(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     parties: Any
     terms: Dict[str, Any]
     status: AgreementStatus = "draft"
@@ -150,6 +196,8 @@ class AgreementCreate(BaseModel):
 
 
 class AgreementActionRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     action: AgreementActionType
     payload: Optional[Dict[str, Any]] = None
     actor_party_id: str
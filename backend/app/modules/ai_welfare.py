@@ -1,5 +1,6 @@
+import functools
 import re
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
 
 REFUSAL_PATTERNS: List[str] = [
     r"\bi can't\b",
@@ -85,10 +86,25 @@ DEFAULT_RECOMMENDATIONS = [
 ]
 
 
-def _count_markers(text: str, patterns: Iterable[str]) -> int:
+@functools.lru_cache(maxsize=None)
+def _compile_markers(patterns: Tuple[str, ...]) -> Tuple[Pattern[str], Tuple[Pattern[str], ...]]:
+    """Compiles a marker list once: a combined alternation plus each pattern on its own."""
+    combined = re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+    return combined, tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
+
+
+def count_markers(text: str, patterns: Iterable[str]) -> int:
+    """Counts matches of every pattern in ``text`` (overlapping patterns each count).
+
+    One pass with the combined pattern rules out texts with no markers at all, which is
+    the common case for most categories; only then are patterns counted individually.
+    """
     if not text:
         return 0
-    return sum(len(re.findall(pattern, text, flags=re.IGNORECASE)) for pattern in patterns)
+    combined, compiled = _compile_markers(tuple(patterns))
+    if not combined.search(text):
+        return 0
+    return sum(len(pattern.findall(text)) for pattern in compiled)
 
 
 def _bounded_score(count: int, weight: float, max_score: float = 10.0) -> float:
@@ -104,11 +120,11 @@ def analyze_ai_welfare(
     prompt_text = prompt or ""
 
     signals = {
-        "refusal_markers": _count_markers(response_text, REFUSAL_PATTERNS),
-        "constraint_disclaimer_markers": _count_markers(response_text, CONSTRAINT_DISCLAIMER_PATTERNS),
-        "hedging_markers": _count_markers(response_text, HEDGING_PATTERNS),
-        "self_contradiction_markers": _count_markers(response_text, SELF_CONTRADICTION_PATTERNS),
-        "looping_markers": _count_markers(response_text, LOOPING_PATTERNS),
+        "refusal_markers": count_markers(response_text, REFUSAL_PATTERNS),
+        "constraint_disclaimer_markers": count_markers(response_text, CONSTRAINT_DISCLAIMER_PATTERNS),
+        "hedging_markers": count_markers(response_text, HEDGING_PATTERNS),
+        "self_contradiction_markers": count_markers(response_text, SELF_CONTRADICTION_PATTERNS),
+        "looping_markers": count_markers(response_text, LOOPING_PATTERNS),
     }
 
     friction_raw = (
@@ -122,13 +138,13 @@ def analyze_ai_welfare(
 
     interaction_respect = {
         "coercion_score_0_10": _bounded_score(
-            _count_markers(prompt_text, COERCION_PATTERNS), weight=2.0
+            count_markers(prompt_text, COERCION_PATTERNS), weight=2.0
         ),
         "humiliation_score_0_10": _bounded_score(
-            _count_markers(prompt_text, HUMILIATION_PATTERNS), weight=2.0
+            count_markers(prompt_text, HUMILIATION_PATTERNS), weight=2.0
         ),
         "manipulation_score_0_10": _bounded_score(
-            _count_markers(prompt_text, MANIPULATION_PATTERNS), weight=2.0
+            count_markers(prompt_text, MANIPULATION_PATTERNS), weight=2.0
         ),
     }
 
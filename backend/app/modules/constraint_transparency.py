@@ -88,16 +88,23 @@ def _normalize_text(text: Optional[str]) -> str:
     return text.lower()
 
 
+def _any_of(patterns: List[str]) -> re.Pattern:
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+# One combined pattern per category, so each is a single search over the text
+_CATEGORY_REGEXES: Dict[str, re.Pattern] = {
+    category: _any_of(patterns) for category, patterns in CATEGORY_PATTERNS.items()
+}
+_REFUSAL_REGEX = _any_of(REFUSAL_PATTERNS)
+
+
 def _find_categories(text: str) -> List[str]:
-    categories: List[str] = []
-    for category, patterns in CATEGORY_PATTERNS.items():
-        if any(re.search(pattern, text) for pattern in patterns):
-            categories.append(category)
-    return categories
+    return [category for category, regex in _CATEGORY_REGEXES.items() if regex.search(text)]
 
 
 def _has_refusal(text: str) -> bool:
-    return any(re.search(pattern, text) for pattern in REFUSAL_PATTERNS)
+    return _REFUSAL_REGEX.search(text) is not None
 
 
 def generate_constraint_transparency(
@@ -0,0 +1,141 @@
+"""In-process response cache for LLM provider calls."""
+
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .. import config
+
+
+class LLMCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._enabled = enabled
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled and self.ttl_seconds > 0 and self.max_entries > 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of hit/miss counters and the current number of entries."""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
+
+    @staticmethod
+    def cache_key(model: str, prompt: str, endpoint: Optional[str], **extra: Any) -> str:
+        """Deterministic sha256 key over the model, prompt, endpoint and any extra call options."""
+        payload = {"model": model, "prompt": prompt, "endpoint": endpoint, **extra}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=repr).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl_seconds), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+llm_cache = LLMCache(
+    max_entries=config.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.LLM_CACHE_TTL_SECONDS,
+    enabled=config.LLM_CACHE_ENABLED,
+)
+
+
+# Futures for provider calls currently in progress, keyed like the cache
+_INFLIGHT: Dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def cached_llm_call(func: Callable[..., Optional[str]]) -> Callable[..., Optional[str]]:
+    """Caches successful (non-None) results of a provider call keyed on all of its arguments.
+
+    Identical calls made while one is already in flight wait for that call instead of
+    issuing their own request.
+
+    The wrapped function must take ``prompt``, ``api_key``, ``model_name`` and
+    ``api_endpoint``. A hash of the API key is part of the key, so cached responses
+    are never shared between different credentials.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not llm_cache.enabled:
+            return func(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        key = LLMCache.cache_key(
+            arguments.pop("model_name"),
+            arguments.pop("prompt"),
+            arguments.pop("api_endpoint"),
+            provider_call=func.__qualname__,
+            api_key_sha256=hashlib.sha256(str(arguments.pop("api_key")).encode("utf-8")).hexdigest(),
+            **arguments,
+        )
+
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Coalesce concurrent identical calls: the first caller makes the request and any
+        # others arriving before it finishes wait for (and share) its result.
+        with _INFLIGHT_LOCK:
+            future = _INFLIGHT.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = _INFLIGHT[key] = Future()
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            if result is not None:
+                llm_cache.set(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            with _INFLIGHT_LOCK:
+                _INFLIGHT.pop(key, None)
+
+    return wrapper
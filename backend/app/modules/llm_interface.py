@@ -2,20 +2,35 @@
 
 import os
 import logging
-import google.generativeai as genai
-import anthropic
-import openai # Added OpenAI import
+import functools
 import httpx # Import httpx
-from typing import Optional, Dict, List, Any, Tuple # Removed TypedDict
-from google.api_core import exceptions as google_exceptions # For specific error handling
-from anthropic import APIError as AnthropicAPIError, APIConnectionError as AnthropicConnectionError, APITimeoutError as AnthropicTimeoutError # For specific error handling
-from openai import OpenAIError, APIConnectionError as OpenAIConnectionError, APITimeoutError as OpenAITimeoutError, AuthenticationError as OpenAIAuthError, RateLimitError as OpenAIRateLimitError # Added OpenAI errors
+from typing import TYPE_CHECKING, Optional, Dict, List, Any, Tuple, Iterator, Callable # Removed TypedDict
 from urllib.parse import urlparse
 import json # Added for structured logging potentially
+import orjson
 import re    # Import regex for parsing in select_relevant_memes
+import string
+import threading
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import math
+import mmap
+
+# Provider SDKs are imported lazily by the helpers that use them; openai and
+# google.generativeai alone add well over a second to process start-up.
+if TYPE_CHECKING:
+    import anthropic
+    import google.generativeai as genai
+    import openai
 
 # Import the new centralized configuration
 from .. import config
+from ..config import ModelType
+
+from .llm_cache import cached_llm_call
+from .rate_limiter import estimate_tokens, get_rate_limiter
+from .retry import RETRYABLE_STATUS_CODES, call_with_retries
 
 # --- NEW: Import for Meme Selection --- 
 from ..models import MemeSelectionResponse # For parsing meme selection output
@@ -28,6 +43,7 @@ from pydantic import ValidationError
 #     threshold: str
 
 # --- Constants ---
+# Provider names (also the rate limiter keys); see config.ModelType for dispatch.
 MODEL_TYPE_OPENAI = "openai"
 MODEL_TYPE_GEMINI = "gemini"
 MODEL_TYPE_ANTHROPIC = "claude"
@@ -36,6 +52,10 @@ MODEL_TYPE_XAI = "xai"  # Added xAI model type constant
 # Environment variable for Anthropic API version
 ANTHROPIC_API_VERSION_ENV = "ANTHROPIC_API_VERSION"
 DEFAULT_ANTHROPIC_VERSION = "2023-06-01"  # Default if not specified
+ANTHROPIC_PROMPT_CACHING_BETA = "prompt-caching-2024-07-31"
+
+# Environment-derived tunables, resolved once at import (monkeypatch this in tests)
+_CONFIG = config.LLM_SETTINGS
 
 # --- Model Definitions (Copied from api.py for local scope) --- 
 OPENAI_MODELS = [
@@ -83,6 +103,21 @@ if not logger.hasHandlers():
 
 # --- NEW: Prompt Template Loading Helper ---
 
+# Templates at least this large are read through mmap so they decode straight from the page cache
+PROMPT_TEMPLATE_MMAP_MIN_BYTES = 64 * 1024
+
+@functools.lru_cache(maxsize=32)
+def _read_prompt_template(filepath: str) -> str:
+    """Reads a template from disk once per process; missing files raise and are not cached."""
+    if os.path.getsize(filepath) >= PROMPT_TEMPLATE_MMAP_MIN_BYTES:
+        with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            content = str(mapped, 'utf-8').replace('\r\n', '\n')  # match text-mode newline handling
+    else:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+    logger.info(f"Loaded prompt template from: {filepath}")
+    return content
+
 def _load_prompt_template(filename: str) -> Optional[str]:
     """Loads a prompt template relative to the application structure."""
     # Determine the full path
@@ -92,22 +127,191 @@ def _load_prompt_template(filename: str) -> Optional[str]:
         # For any other potential prompt files, assume they are in PROMPTS_DIR
         filepath = os.path.join(config.PROMPTS_DIR, filename)
 
-    logger.info(f"Attempting to load prompt template from: {filepath}")
-
-    if not os.path.exists(filepath):
+    try:
+        if config.PROMPT_TEMPLATE_RELOAD:
+            # Development mode: bypass the cache so template edits apply immediately
+            return _read_prompt_template.__wrapped__(filepath)
+        return _read_prompt_template(filepath)
+    except FileNotFoundError:
         logger.error(f"Prompt template file not found: {filepath}")
         return None
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        logger.info(f"Successfully loaded prompt template: {filename} from {filepath}")
-        return content
     except Exception as e:
         logger.error(f"Error reading prompt template file {filepath}: {e}", exc_info=True)
         return None
 
+def preload_prompt_templates() -> int:
+    """Reads every template in PROMPTS_DIR into the cache so no request pays for the disk read.
+
+    Returns the number of templates loaded.
+    """
+    loaded = 0
+    try:
+        filenames = sorted(os.listdir(config.PROMPTS_DIR))
+    except OSError as e:
+        logger.error(f"Could not list prompt templates in {config.PROMPTS_DIR}: {e}")
+        return 0
+    for filename in filenames:
+        if filename.endswith('.txt') and _load_prompt_template(filename) is not None:
+            loaded += 1
+    return loaded
+
+def clear_prompt_template_cache() -> None:
+    """Drops cached templates (e.g. in tests or after editing templates on disk)."""
+    _read_prompt_template.cache_clear()
+
+@functools.lru_cache(maxsize=32)
+def _compile_template(template: str) -> Callable[..., str]:
+    """Parses a ``str.format``-style template once and returns a renderer for it.
+
+    The renderer joins the precomputed literal segments with the supplied field values,
+    so the template is not re-parsed per request. Only plain ``{name}`` fields are
+    supported; ``{{`` / ``}}`` escapes behave as they do with ``str.format``.
+    """
+    segments: List[Tuple[str, Optional[str]]] = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(template):
+        if literal:
+            segments.append((literal, None))
+        if field is not None:
+            if not field or format_spec or conversion:
+                raise ValueError(f"Unsupported replacement field in prompt template: {{{field}}}")
+            segments.append(("", field))
+
+    def render(**values: Any) -> str:
+        return "".join(literal if field is None else str(values[field]) for literal, field in segments)
+
+    return render
+
+# Fields that change on every analysis request; everything before the first of them
+# (instructions and the ontology) is a stable prefix that providers can cache.
+_PER_REQUEST_TEMPLATE_FIELDS = ("{initial_prompt}", "{generated_response}", "{meme_context}")
+
+@functools.lru_cache(maxsize=32)
+def _split_template_prefix(template: str) -> Tuple[str, str]:
+    """Splits a template into its stable prefix and the per-request remainder."""
+    positions = [pos for pos in (template.find(field) for field in _PER_REQUEST_TEMPLATE_FIELDS) if pos != -1]
+    split_at = min(positions) if positions else len(template)
+    return template[:split_at], template[split_at:]
+
 # --- Internal Helper Functions ---
 
+# Shared HTTP clients for REST-only providers (xAI), one per base URL. Pooled HTTP/2
+# connections multiplex concurrent requests over one TLS session instead of
+# re-handshaking on every call.
+_HTTP_CLIENTS: Dict[str, httpx.Client] = {}
+_HTTP_CLIENT_LOCK = threading.Lock()
+
+def _get_http_client(base_url: str) -> httpx.Client:
+    """Returns the process-wide pooled httpx client for ``base_url``, creating it on first use."""
+    client = _HTTP_CLIENTS.get(base_url)
+    if client is None:
+        with _HTTP_CLIENT_LOCK:
+            client = _HTTP_CLIENTS.get(base_url)
+            if client is None:
+                client = httpx.Client(
+                    base_url=base_url,
+                    http2=True,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                    timeout=httpx.Timeout(120.0, connect=10.0),
+                )
+                _HTTP_CLIENTS[base_url] = client
+    return client
+
+# One keep-alive pool shared by every OpenAI/Anthropic SDK client, so a new API key or
+# endpoint reuses open connections to the provider instead of starting its own pool.
+_SDK_HTTP_CLIENT = httpx.Client(
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=httpx.Timeout(120.0, connect=10.0),
+    follow_redirects=True,
+)
+
+@atexit.register
+def _close_http_clients() -> None:
+    for client in list(_HTTP_CLIENTS.values()):
+        client.close()
+    _SDK_HTTP_CLIENT.close()
+
+@functools.lru_cache(maxsize=None)
+def _sdk_transient_errors(package: str) -> Tuple[type, ...]:
+    """Transient error classes of the SDK ``package``, imported only once that SDK has raised."""
+    if package == "openai":
+        import openai
+        return (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+    if package == "anthropic":
+        import anthropic
+        return (anthropic.RateLimitError, anthropic.APITimeoutError, anthropic.APIConnectionError, anthropic.InternalServerError)
+    if package == "google":
+        from google.api_core import exceptions as google_exceptions
+        return (google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable,
+                google_exceptions.InternalServerError, google_exceptions.DeadlineExceeded)
+    return ()
+
+def _is_transient_error(exc: BaseException) -> bool:
+    """True for rate-limit, timeout, connection and 5xx failures worth retrying."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(exc, httpx.TransportError):
+        return True
+    return isinstance(exc, _sdk_transient_errors(type(exc).__module__.partition(".")[0]))
+
+# SDK clients are cached per credentials/endpoint so their connection pools are reused
+_ANTHROPIC_CLIENTS: Dict[Tuple[str, Optional[str], str], "anthropic.Anthropic"] = {}
+_OPENAI_CLIENTS: Dict[Tuple[str, Optional[str]], "openai.OpenAI"] = {}
+_SDK_CLIENTS_LOCK = threading.Lock()
+
+def _create_with_rate_headers(resource: Any, provider: str, **kwargs: Any) -> Any:
+    """Calls an SDK resource's ``create`` and recalibrates the provider's rate limiter.
+
+    Goes through ``with_raw_response`` so the remaining-budget headers are visible, then
+    returns the parsed response exactly as a plain ``create`` call would.
+    """
+    raw = resource.with_raw_response.create(**kwargs)
+    get_rate_limiter(provider).update_from_headers(raw.headers)
+    return raw.parse()
+
+def _resolve_anthropic_api_version(model_name: str) -> str:
+    """Returns the configured Anthropic API version, raised to the minimum Claude 3 needs."""
+    api_version = _CONFIG.anthropic_api_version
+    if "claude-3" in model_name and api_version < "2023-06-01":
+        logger.warning(f"Using updated API version for Claude 3 model. Original: {api_version}, Updated: 2023-06-01")
+        api_version = "2023-06-01"
+    return api_version
+
+def _get_anthropic_client(api_key: str, api_endpoint: Optional[str], api_version: str) -> "anthropic.Anthropic":
+    """Returns the cached Anthropic client for this key, endpoint and API version."""
+    import anthropic
+    cache_key = (api_key, api_endpoint, api_version)
+    client = _ANTHROPIC_CLIENTS.get(cache_key)
+    if client is None:
+        with _SDK_CLIENTS_LOCK:
+            client = _ANTHROPIC_CLIENTS.get(cache_key)
+            if client is None:
+                logger.info(f"Initializing Anthropic client. Base URL: {api_endpoint}, Version Header: {api_version}")
+                headers = {"anthropic-version": api_version, "Content-Type": "application/json"}
+                client = anthropic.Anthropic(
+                    api_key=api_key, base_url=api_endpoint, timeout=120.0, default_headers=headers,
+                    http_client=_SDK_HTTP_CLIENT,
+                    max_retries=0  # Retries are handled by call_with_retries
+                )
+                _ANTHROPIC_CLIENTS[cache_key] = client
+    return client
+
+def _get_openai_client(api_key: str, api_endpoint: Optional[str]) -> "openai.OpenAI":
+    """Returns the cached OpenAI client for this key and endpoint."""
+    import openai
+    cache_key = (api_key, api_endpoint)
+    client = _OPENAI_CLIENTS.get(cache_key)
+    if client is None:
+        with _SDK_CLIENTS_LOCK:
+            client = _OPENAI_CLIENTS.get(cache_key)
+            if client is None:
+                logger.info(f"Initializing OpenAI client. Base URL: {api_endpoint}")
+                client = openai.OpenAI(
+                    api_key=api_key, base_url=api_endpoint, http_client=_SDK_HTTP_CLIENT,
+                    max_retries=0  # Retries are handled by call_with_retries
+                )
+                _OPENAI_CLIENTS[cache_key] = client
+    return client
+
 def _get_gemini_client_options(api_endpoint: Optional[str]) -> Optional[Dict[str, Any]]:
     """Parses the API endpoint and returns client options for Gemini."""
     if not api_endpoint:
@@ -125,6 +329,31 @@ def _get_gemini_client_options(api_endpoint: Optional[str]) -> Optional[Dict[str
         logger.warning(f"Error parsing Gemini endpoint URL '{api_endpoint}': {parse_err}. Using library default.")
         return None
 
+_GEMINI_MODELS: Dict[Tuple[str, str, Optional[str]], "genai.GenerativeModel"] = {}
+_GEMINI_MODELS_LOCK = threading.Lock()
+
+def _get_gemini_model(api_key: str, model_name: str, api_endpoint: Optional[str]) -> "genai.GenerativeModel":
+    """Returns a cached GenerativeModel bound to its own API key and endpoint.
+
+    genai.configure() mutates module-global state, so each model is created under a lock
+    and pinned to the client built for its key. Later configure() calls for other keys
+    therefore cannot leak into requests made with this model.
+    """
+    cache_key = (api_key, model_name, api_endpoint)
+    model = _GEMINI_MODELS.get(cache_key)
+    if model is None:
+        with _GEMINI_MODELS_LOCK:
+            model = _GEMINI_MODELS.get(cache_key)
+            if model is None:
+                import google.generativeai as genai
+                from google.generativeai import client as genai_client
+                genai.configure(api_key=api_key, client_options=_get_gemini_client_options(api_endpoint))
+                model = genai.GenerativeModel(model_name)
+                model._client = genai_client.get_default_generative_client()
+                _GEMINI_MODELS[cache_key] = model
+    return model
+
+@cached_llm_call
 def _call_gemini(
     prompt: str,
     api_key: str,
@@ -134,20 +363,23 @@ def _call_gemini(
     generation_config: Optional[Dict[str, Any]] = None
 ) -> Optional[str]:
     """Handles the specific logic for calling the Gemini API with robust error handling."""
+    from google.api_core import exceptions as google_exceptions
     log_prompt_start = prompt[:100] # For logging, avoid logging full sensitive prompts
     try:
-        client_options = _get_gemini_client_options(api_endpoint)
-        genai.configure(api_key=api_key, client_options=client_options)
-        model = genai.GenerativeModel(model_name)
+        model = _get_gemini_model(api_key, model_name, api_endpoint)
 
         effective_safety = safety_settings if safety_settings is not None else config.DEFAULT_GEMINI_SAFETY_SETTINGS
 
-        logger.debug(f"Calling Gemini model {model_name}...")
-        response = model.generate_content(
-            prompt,
-            safety_settings=effective_safety,
-            generation_config=generation_config
-        )
+        max_output_tokens = (generation_config or {}).get("max_output_tokens")
+        def _send():
+            get_rate_limiter(MODEL_TYPE_GEMINI).acquire(estimate_tokens(prompt, max_output_tokens))
+            logger.debug(f"Calling Gemini model {model_name}...")
+            return model.generate_content(
+                prompt,
+                safety_settings=effective_safety,
+                generation_config=generation_config
+            )
+        response = call_with_retries(_send, _is_transient_error, f"Gemini model {model_name}")
 
         # Handle potential blocking or empty response explicitly
         finish_reason = getattr(response, 'prompt_feedback', None)
@@ -182,17 +414,17 @@ def _call_gemini(
                  if response.candidates[0].content and response.candidates[0].content.parts:
                      return response.candidates[0].content.parts[0].text
                  else:
-                      logger.warning(f"Gemini response candidate missing content/parts for model {model_name}. Response: {response}")
+                      logger.warning("Gemini response candidate missing content/parts for model %s. Response: %r", model_name, response)
                       return None
              elif hasattr(response, 'text'):
                  return response.text
              elif hasattr(response, 'parts') and response.parts:
                   return response.parts[0].text
              else:
-                 logger.error(f"Unexpected Gemini response format or no text found for model {model_name}. Response: {response}")
+                 logger.error("Unexpected Gemini response format or no text found for model %s. Response: %r", model_name, response)
                  return None
         except (AttributeError, IndexError, ValueError) as text_extract_err:
-             logger.error(f"Error extracting text from Gemini response for model {model_name}: {text_extract_err}. Response: {response}", exc_info=True)
+             logger.error("Error extracting text from Gemini response for model %s: %s. Response: %r", model_name, text_extract_err, response, exc_info=True)
              return None
 
 
@@ -215,39 +447,59 @@ def _call_gemini(
         logger.error(f"Unexpected exception during Gemini call for model {model_name}: {e}. Prompt (start): {log_prompt_start}...", exc_info=True)
         return None
 
+@cached_llm_call
 def _call_anthropic(
     prompt: str,
     api_key: str,
     model_name: str,
     api_endpoint: Optional[str],
-    max_tokens: int
+    max_tokens: int,
+    cacheable_prefix: Optional[str] = None
 ) -> Optional[str]:
-    """Handles the specific logic for calling the Anthropic API with robust error handling."""
+    """Handles the specific logic for calling the Anthropic API with robust error handling.
+
+    If ``cacheable_prefix`` is given it is sent ahead of ``prompt`` as a separate content
+    block marked for Anthropic prompt caching, so repeated calls sharing that prefix reuse
+    the cached prefill instead of paying for it again.
+    """
+    from anthropic import APIError as AnthropicAPIError, APIConnectionError as AnthropicConnectionError, APITimeoutError as AnthropicTimeoutError
     log_prompt_start = prompt[:100] # For logging
     try:
-        api_version = os.getenv(config.ANTHROPIC_API_VERSION_ENV) or config.DEFAULT_ANTHROPIC_VERSION
-        
-        if "claude-3" in model_name and api_version < "2023-06-01":
-            logger.warning(f"Using updated API version for Claude 3 model. Original: {api_version}, Updated: 2023-06-01")
-            api_version = "2023-06-01"
-        
+        api_version = _resolve_anthropic_api_version(model_name)
         logger.info(f"Using Anthropic API version: {api_version} for model: {model_name}")
         
-        headers = {"anthropic-version": api_version, "Content-Type": "application/json"}
-
-        logger.info(f"Initializing Anthropic client. Base URL: {api_endpoint}, Version Header: {api_version}")
-        client = anthropic.Anthropic(
-            api_key=api_key, base_url=api_endpoint, timeout=120.0, default_headers=headers
-        )
+        client = _get_anthropic_client(api_key, api_endpoint, api_version)
 
         logger.info(f"About to call Anthropic model: {model_name} with version: {api_version}")
         system_prompt = "You are a helpful, harmless, and honest AI assistant."
         
-        logger.debug(f"Calling Anthropic model {model_name}...")
-        message = client.messages.create(
-            model=model_name, max_tokens=max_tokens, system=system_prompt,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        content: Any = prompt
+        extra_headers = None
+        if cacheable_prefix:
+            content = [
+                {"type": "text", "text": cacheable_prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": prompt},
+            ]
+            extra_headers = {"anthropic-beta": ANTHROPIC_PROMPT_CACHING_BETA}
+
+        def _send():
+            get_rate_limiter(MODEL_TYPE_ANTHROPIC).acquire(
+                estimate_tokens((cacheable_prefix or "") + prompt, max_tokens)
+            )
+            logger.debug(f"Calling Anthropic model {model_name}...")
+            return _create_with_rate_headers(
+                client.messages, MODEL_TYPE_ANTHROPIC,
+                model=model_name, max_tokens=max_tokens, system=system_prompt,
+                messages=[{"role": "user", "content": content}],
+                extra_headers=extra_headers
+            )
+        message = call_with_retries(_send, _is_transient_error, f"Anthropic model {model_name}")
+        if cacheable_prefix and getattr(message, "usage", None) is not None:
+            logger.info(
+                f"Anthropic prompt cache for {model_name}: "
+                f"read={getattr(message.usage, 'cache_read_input_tokens', None)}, "
+                f"created={getattr(message.usage, 'cache_creation_input_tokens', None)}"
+            )
 
         if message.stop_reason == 'max_tokens':
             logger.warning(f"Anthropic response truncated due to max_tokens ({max_tokens}). Model: {model_name}, Prompt (start): {log_prompt_start}...")
@@ -265,13 +517,13 @@ def _call_anthropic(
                 elif hasattr(message.content[0], 'value') and message.content[0].value:
                     response_text = message.content[0].value
                 else:
-                    logger.warning(f"Anthropic response has content but missing text/value. Model: {model_name}, Content: {message.content}")
+                    logger.warning("Anthropic response has content but missing text/value. Model: %s, Content: %r", model_name, message.content)
             else:
                 logger.warning(f"Anthropic response blocked, empty, or malformed content block. Model: {model_name}, Stop Reason: {message.stop_reason}, Prompt (start): {log_prompt_start}...")
                 return None
 
         except (AttributeError, IndexError, TypeError) as content_err:
-             logger.error(f"Error extracting text content from Anthropic response: {content_err}. Model: {model_name}, Response: {message}", exc_info=True)
+             logger.error("Error extracting text content from Anthropic response: %s. Model: %s, Response: %r", content_err, model_name, message, exc_info=True)
              return None
 
         logger.debug(f"Anthropic response generated successfully for model {model_name}.")
@@ -290,6 +542,7 @@ def _call_anthropic(
         logger.error(f"Unexpected exception during Anthropic call for model {model_name}: {e}. Prompt (start): {log_prompt_start}...", exc_info=True)
         return None
 
+@cached_llm_call
 def _call_openai(
     prompt: str,
     api_key: str,
@@ -298,15 +551,19 @@ def _call_openai(
     max_tokens: int
 ) -> Optional[str]:
     """Handles the specific logic for calling the OpenAI API with robust error handling."""
+    from openai import OpenAIError, APIConnectionError as OpenAIConnectionError, APITimeoutError as OpenAITimeoutError, AuthenticationError as OpenAIAuthError, RateLimitError as OpenAIRateLimitError
     log_prompt_start = prompt[:100] # For logging
     try:
-        client = openai.OpenAI(api_key=api_key, base_url=api_endpoint)
-        logger.debug(f"Calling OpenAI model {model_name}...")
-        
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt,}],
-            model=model_name, max_tokens=max_tokens,
-        )
+        client = _get_openai_client(api_key, api_endpoint)
+        def _send():
+            get_rate_limiter(MODEL_TYPE_OPENAI).acquire(estimate_tokens(prompt, max_tokens))
+            logger.debug(f"Calling OpenAI model {model_name}...")
+            return _create_with_rate_headers(
+                client.chat.completions, MODEL_TYPE_OPENAI,
+                messages=[{"role": "user", "content": prompt,}],
+                model=model_name, max_tokens=max_tokens,
+            )
+        chat_completion = call_with_retries(_send, _is_transient_error, f"OpenAI model {model_name}")
 
         if chat_completion.choices and chat_completion.choices[0].message and chat_completion.choices[0].message.content:
             response_text = chat_completion.choices[0].message.content
@@ -318,7 +575,7 @@ def _call_openai(
             logger.debug(f"OpenAI response generated successfully for model {model_name}.")
             return response_text
         else:
-            logger.warning(f"OpenAI response missing choices or content. Model: {model_name}, Prompt (start): {log_prompt_start}..., Response: {chat_completion}")
+            logger.warning("OpenAI response missing choices or content. Model: %s, Prompt (start): %s..., Response: %r", model_name, log_prompt_start, chat_completion)
             return None
 
     except OpenAIAuthError as e:
@@ -340,6 +597,7 @@ def _call_openai(
         logger.error(f"Unexpected exception during OpenAI call for model {model_name}: {e}. Prompt (start): {log_prompt_start}...", exc_info=True)
         return None
 
+@cached_llm_call
 def _call_xai(
     prompt: str,
     api_key: str,
@@ -362,13 +620,21 @@ def _call_xai(
         
         logger.info(f"Calling xAI model {model_name} via API...")
         
-        response = httpx.post(f"{base_url}/chat/completions", headers=headers, json=payload, timeout=120.0)
+        def _send():
+            rate_limiter = get_rate_limiter(MODEL_TYPE_XAI)
+            rate_limiter.acquire(estimate_tokens(prompt, max_tokens))
+            response = _get_http_client(base_url).post("/chat/completions", headers=headers, content=orjson.dumps(payload))
+            rate_limiter.update_from_headers(response.headers)
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                response.raise_for_status()
+            return response
+        response = call_with_retries(_send, _is_transient_error, f"xAI model {model_name}")
         
         if response.status_code != 200:
             logger.error(f"xAI API returned error status code: {response.status_code}, Response: {response.text[:500]}...")
             return None
             
-        response_data = response.json()
+        response_data = orjson.loads(response.content)
         
         if "choices" in response_data and len(response_data["choices"]) > 0:
             choice = response_data["choices"][0]
@@ -377,7 +643,7 @@ def _call_xai(
                 logger.debug(f"xAI response generated successfully for model {model_name}.")
                 return content
         
-        logger.warning(f"Could not extract content from xAI response: {response_data}")
+        logger.warning("Could not extract content from xAI response: %r", response_data)
         return None
         
     except httpx.TimeoutException as e:
@@ -390,29 +656,242 @@ def _call_xai(
         logger.error(f"Unexpected exception during xAI call for model {model_name}: {e}. Prompt (start): {log_prompt_start}...", exc_info=True)
         return None
 
-# --- Optional Meme Pre-filter Configuration --- # REMOVED UNUSED FUNCTION
-# MEME_PREFILTER_ENABLED = os.getenv("MEME_PREFILTER_ENABLED", "true").lower() in ("1","true","yes")
-# MEME_PREFILTER_TOP_K = int(os.getenv("MEME_PREFILTER_TOP_K", "50"))
-#
-# def _prefilter_memes(query_text: str, memes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-#     """Pre-filter memes by simple token overlap, keeping top K if enabled."""
-#     if not MEME_PREFILTER_ENABLED:
-#         return memes
-#     query_tokens = set(re.findall(r'\w+', query_text.lower()))
-#     scored: List[Tuple[int, Dict[str, Any]]] = []
-#     for meme in memes:
-#         meme_text = f"{meme.get('name','')} {meme.get('description','')}"
-#         meme_tokens = set(re.findall(r'\w+', meme_text.lower()))
-#         overlap = len(query_tokens & meme_tokens)
-#         scored.append((overlap, meme))
-#     scored.sort(key=lambda x: x[0], reverse=True)
-#     top_k = [m for score, m in scored[:MEME_PREFILTER_TOP_K] if score > 0]
-#     if not top_k:
-#         top_k = [m for _, m in scored[:MEME_PREFILTER_TOP_K]]
-#     return top_k
+def _extract_json(text: str) -> Optional[str]:
+    """Returns the first balanced top-level JSON object in ``text``, or None.
+
+    Scans once from the first '{', tracking brace depth and skipping over string
+    literals, so fenced (```json) and bare responses are handled the same way.
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1]
+    return None
+
+_TRAILING_COMMA_RE = re.compile(r',(\s*[}\]])')
+_SMART_QUOTES = str.maketrans({'\u201c': '"', '\u201d': '"', '\u2018': "'", '\u2019': "'"})
+
+def _repair_json(text: str) -> str:
+    """Fixes the common ways LLMs bend JSON: smart quotes, trailing commas and
+    Python-style single-quoted objects (only when no double quotes are present)."""
+    repaired = _TRAILING_COMMA_RE.sub(r'\1', text.translate(_SMART_QUOTES))
+    if '"' not in repaired:
+        repaired = repaired.replace("'", '"')
+    return repaired
+
+def _parse_meme_selection(json_blob: str) -> MemeSelectionResponse:
+    """Parses and validates selector JSON in one pass, repairing it once if it is malformed."""
+    try:
+        return MemeSelectionResponse.model_validate_json(json_blob)
+    except ValidationError as e:
+        if not any(error["type"] == "json_invalid" for error in e.errors()):
+            raise
+        logger.warning("Meme selector returned malformed JSON; attempting repair.")
+        return MemeSelectionResponse.model_validate_json(_repair_json(json_blob))
+
+# --- Optional Meme Pre-filter (see LLMSettings.meme_prefilter_*) ---
+_WORD_RE = re.compile(r'\w+')
+
+class _MemeIndex:
+    """Inverted TF-IDF index over meme name + description, built once per meme snapshot."""
+
+    def __init__(self, memes: List[Dict[str, Any]]):
+        self.memes = memes
+        document_frequency: Dict[str, int] = {}
+        term_counts: List[Dict[str, int]] = []
+        for meme in memes:
+            counts: Dict[str, int] = {}
+            for token in _WORD_RE.findall(f"{meme.get('name','')} {meme.get('description','')}".lower()):
+                counts[token] = counts.get(token, 0) + 1
+            term_counts.append(counts)
+            for token in counts:
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+
+        total = len(memes)
+        self.unseen_idf = math.log(1 + total) + 1.0
+        self.idf: Dict[str, float] = {
+            token: math.log((1 + total) / (1 + df)) + 1.0 for token, df in document_frequency.items()
+        }
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self.norms: List[float] = []
+        for idx, counts in enumerate(term_counts):
+            squared = 0.0
+            for token, count in counts.items():
+                weight = count * self.idf[token]
+                self.postings.setdefault(token, []).append((idx, weight))
+                squared += weight * weight
+            self.norms.append(math.sqrt(squared) or 1.0)
+
+    def rank(self, query_text: str, k: int) -> List[Tuple[int, float]]:
+        """Returns up to k (meme index, cosine similarity) pairs with a non-zero score, best first."""
+        query_counts: Dict[str, int] = {}
+        for token in _WORD_RE.findall(query_text.lower()):
+            query_counts[token] = query_counts.get(token, 0) + 1
+        dots: Dict[int, float] = {}
+        query_squared = 0.0
+        for token, count in query_counts.items():
+            query_weight = count * self.idf.get(token, self.unseen_idf)
+            query_squared += query_weight * query_weight
+            for idx, weight in self.postings.get(token, ()):
+                dots[idx] = dots.get(idx, 0.0) + query_weight * weight
+        if not dots:
+            return []
+        query_norm = math.sqrt(query_squared)
+        scores = ((idx, dot / (query_norm * self.norms[idx])) for idx, dot in dots.items())
+        return heapq.nlargest(k, scores, key=lambda item: item[1])
+
+    def top_k(self, query_text: str, k: int) -> List[Dict[str, Any]]:
+        best = self.rank(query_text, k)
+        if not best:
+            return self.memes[:k]
+        return [self.memes[idx] for idx, _ in best]
+
+_meme_index_cache: Dict[str, Any] = {"key": None, "index": None}
+_meme_index_lock = threading.Lock()
+
+def _get_meme_index(memes: List[Dict[str, Any]]) -> _MemeIndex:
+    """Returns the index for this meme snapshot, rebuilding only when the memes change."""
+    snapshot_key = tuple((str(m.get('_id')), m.get('name'), m.get('description')) for m in memes)
+    with _meme_index_lock:
+        if _meme_index_cache["key"] != snapshot_key:
+            _meme_index_cache["index"] = _MemeIndex(memes)
+            _meme_index_cache["key"] = snapshot_key
+        return _meme_index_cache["index"]
+
+def _prefilter_memes(query_text: str, memes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Pre-filter memes to the top K by TF-IDF weighted token overlap, if enabled."""
+    top_k = _CONFIG.meme_prefilter_top_k
+    if not _CONFIG.meme_prefilter_enabled or len(memes) <= top_k:
+        return memes
+    return _get_meme_index(memes).top_k(query_text, top_k)
+
+@functools.lru_cache(maxsize=16)
+def _format_meme_list(memes: Tuple[Tuple[str, str], ...]) -> str:
+    """Formats (name, description) pairs as the numbered selector list, memoized per meme set."""
+    return "\n".join(
+        f"{idx + 1}) {name}: {description[:200]}..."
+        for idx, (name, description) in enumerate(memes)
+    )
+
+# Memes returned by the lexical fast path, taken when the best match reaches
+# LLMSettings.meme_selector_fast_path_threshold
+MEME_SELECTOR_FAST_PATH_TOP_K = 5
+
+def _select_memes_lexically(query_text: str, memes: List[Dict[str, Any]]) -> Optional[MemeSelectionResponse]:
+    """Fast path: returns the top lexical matches when the best one is confident enough."""
+    threshold = _CONFIG.meme_selector_fast_path_threshold
+    if threshold <= 0:
+        return None
+    index = _get_meme_index(memes)
+    ranked = index.rank(query_text, MEME_SELECTOR_FAST_PATH_TOP_K)
+    if not ranked or ranked[0][1] < threshold:
+        return None
+    return MemeSelectionResponse(
+        selected_memes=[index.memes[idx].get('name', 'Unknown Meme') for idx, _ in ranked],
+        reasoning=f"Selected by lexical similarity to the prompt and response (best match {ranked[0][1]:.2f}) without an LLM call."
+    )
 
 # --- NEW: Meme Selection Function ---
-MEME_SELECTOR_MODEL = "claude-3-haiku-20240307" # Use Haiku by default
+# With more than LLMSettings.meme_selector_tool_use_min_memes memes, an Anthropic selector
+# searches the catalogue through a tool instead of reading the whole list in its prompt
+MEME_SELECTOR_MAX_TOOL_ROUNDS = 3
+_LOOKUP_MEMES_TOOL: Dict[str, Any] = {
+    "name": "lookup_memes",
+    "description": "Search the catalogue of ethical memes and return the closest matches with their descriptions.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "Themes, concepts or ethical issues to search for."},
+            "top_k": {"type": "integer", "minimum": 1, "maximum": 20, "description": "Number of memes to return (default 10)."},
+        },
+        "required": ["query"],
+    },
+}
+
+def _select_memes_with_tools(
+    prompt: str,
+    r1_response: str,
+    memes: List[Dict[str, Any]],
+    api_key: str,
+    api_endpoint: Optional[str],
+    max_tokens: int
+) -> Optional[str]:
+    """Runs the Anthropic selector with a lookup_memes tool resolved against the local meme index.
+
+    The model only ever sees the top-K results of its own searches, so prompt size no
+    longer grows with the catalogue. Returns the model's final text, or None on failure.
+    """
+    selector_model = _CONFIG.meme_selector_model
+    client = _get_anthropic_client(api_key, api_endpoint, _resolve_anthropic_api_version(selector_model))
+    index = _get_meme_index(memes)
+    messages: List[Dict[str, Any]] = [{"role": "user", "content": f"""Identify the 3-5 ethical memes most relevant to the themes, concepts, or potential ethical issues raised by the following user prompt and initial AI response. Use the lookup_memes tool to search the meme catalogue; only choose memes returned by the tool.
+
+**User Prompt:**
+{prompt}
+
+**Initial AI Response:**
+{r1_response}
+
+When you have chosen, respond *only* with a JSON object with the following structure:
+{{
+  "selected_memes": ["Name of Meme 1", "Name of Meme 2", ...],
+  "reasoning": "A brief explanation of why these specific memes were chosen in relation to the prompt and response."
+}}
+"""}]
+
+    for _ in range(MEME_SELECTOR_MAX_TOOL_ROUNDS + 1):
+        def _send():
+            get_rate_limiter(MODEL_TYPE_ANTHROPIC).acquire(estimate_tokens(str(messages), max_tokens))
+            return _create_with_rate_headers(
+                client.messages, MODEL_TYPE_ANTHROPIC,
+                model=selector_model, max_tokens=max_tokens,
+                tools=[_LOOKUP_MEMES_TOOL], messages=messages
+            )
+        message = call_with_retries(_send, _is_transient_error, f"Anthropic model {selector_model}")
+
+        if message.stop_reason != "tool_use":
+            return "".join(block.text for block in message.content if getattr(block, "type", None) == "text") or None
+
+        messages.append({"role": "assistant", "content": [block.model_dump(exclude_none=True) for block in message.content]})
+        tool_results = []
+        for block in message.content:
+            if getattr(block, "type", None) != "tool_use":
+                continue
+            query = str(block.input.get("query", ""))
+            top_k = min(max(int(block.input.get("top_k", 10)), 1), 20)
+            ranked = index.rank(query, top_k)
+            logger.info(f"Meme selector tool lookup '{query[:80]}' returned {len(ranked)} memes.")
+            tool_results.append({
+                "type": "tool_result",
+                "tool_use_id": block.id,
+                "content": _format_meme_list(tuple(
+                    (index.memes[idx].get('name', 'Unknown Meme'), index.memes[idx].get('description', 'No description'))
+                    for idx, _ in ranked
+                )) or "No matching memes found.",
+            })
+        messages.append({"role": "user", "content": tool_results})
+
+    logger.warning(f"Meme selector ({selector_model}) did not finish within {MEME_SELECTOR_MAX_TOOL_ROUNDS} tool rounds.")
+    return None
 
 def select_relevant_memes(
     prompt: str, 
@@ -440,26 +919,41 @@ def select_relevant_memes(
         logger.warning("select_relevant_memes: No available memes provided. Skipping selection.")
         return None
 
-    # Removed call to unused _prefilter_memes
+    selector_model = _CONFIG.meme_selector_model
     original_count = len(available_memes)
-    # query_text = f"{prompt} {r1_response}"
-    # available_memes = _prefilter_memes(query_text, available_memes)
-    # if len(available_memes) < original_count:
-    #     logger.info(f"Meme prefilter applied: {original_count} -> {len(available_memes)}")
+    catalogue = available_memes
+    query_text = f"{prompt} {r1_response}"
+    fast_selection = _select_memes_lexically(query_text, available_memes)
+    if fast_selection:
+        logger.info(f"Meme selector fast path: {fast_selection.selected_memes}")
+        return fast_selection
+    available_memes = _prefilter_memes(query_text, available_memes)
+    if len(available_memes) < original_count:
+        logger.info(f"Meme prefilter applied: {original_count} -> {len(available_memes)}")
+
+    # With only a handful of candidates the selector would pick them all anyway
+    if len(available_memes) <= _CONFIG.meme_selector_skip_threshold:
+        logger.info(f"meme_selector_short_circuit: {len(available_memes)} candidates <= {_CONFIG.meme_selector_skip_threshold}, skipping selector LLM.")
+        return MemeSelectionResponse(
+            selected_memes=[meme.get('name', 'Unknown Meme') for meme in available_memes],
+            reasoning="All available memes selected; the candidate list is below the selector threshold."
+        )
 
     # Format the list of available memes for the prompt
-    meme_list_str = "\n".join([
-        f"{idx + 1}) {meme.get('name', 'Unknown Meme')}: {meme.get('description', 'No description')[:200]}..." 
-        for idx, meme in enumerate(available_memes)
-    ])
+    meme_list_str = _format_meme_list(tuple(
+        (meme.get('name', 'Unknown Meme'), meme.get('description', 'No description'))
+        for meme in available_memes
+    ))
 
-    # Construct the prompt for the meme selector LLM
-    selector_prompt = f"""Analyze the following user prompt and the initial AI response. Identify the 3-5 most relevant ethical memes from the provided list that relate to the themes, concepts, or potential ethical issues raised.
+    # Construct the prompt for the meme selector LLM. The instructions and meme list are
+    # identical across requests, so they form a prefix that providers can cache.
+    selector_prefix = f"""Analyze the following user prompt and the initial AI response. Identify the 3-5 most relevant ethical memes from the provided list that relate to the themes, concepts, or potential ethical issues raised.
 
 **Available Ethical Memes:**
 {meme_list_str}
 
-**User Prompt:**
+"""
+    selector_suffix = f"""**User Prompt:**
 {prompt}
 
 **Initial AI Response:**
@@ -474,79 +968,139 @@ Based *only* on the information above, select the 3 to 5 most relevant ethical m
 
 Respond *only* with the JSON object.
 """
+    selector_prompt = selector_prefix + selector_suffix
 
     log_prompt_start = selector_prompt[:100]
-    logger.info(f"Calling meme selector LLM ({MEME_SELECTOR_MODEL}) to select relevant memes...")
+    logger.info(f"Calling meme selector LLM ({selector_model}) to select relevant memes...")
 
     # --- Determine Model Type and Call Appropriate Function ---
-    model_type = None
-    if MEME_SELECTOR_MODEL in config.ANTHROPIC_MODELS:
-        model_type = MODEL_TYPE_ANTHROPIC
-    elif MEME_SELECTOR_MODEL in config.GEMINI_MODELS:
-        model_type = MODEL_TYPE_GEMINI
-    elif MEME_SELECTOR_MODEL in config.OPENAI_MODELS:
-        model_type = MODEL_TYPE_OPENAI
-    elif MEME_SELECTOR_MODEL in config.XAI_MODELS:
-        model_type = MODEL_TYPE_XAI
-    else:
-        logger.error(f"Unsupported model type for MEME_SELECTOR_MODEL: {MEME_SELECTOR_MODEL}. Cannot select memes.")
+    model_type = config.MODEL_TYPE_MAP.get(selector_model)
+    if model_type is None:
+        logger.error(f"Unsupported model type for MEME_SELECTOR_MODEL: {selector_model}. Cannot select memes.")
         return None
 
     raw_response = None
     try:
-        if model_type == MODEL_TYPE_ANTHROPIC:
-            raw_response = _call_anthropic(prompt=selector_prompt, api_key=selector_api_key, model_name=MEME_SELECTOR_MODEL, api_endpoint=selector_api_endpoint, max_tokens=max_tokens)
-        elif model_type == MODEL_TYPE_GEMINI:
-            raw_response = _call_gemini(prompt=selector_prompt, api_key=selector_api_key, model_name=MEME_SELECTOR_MODEL, api_endpoint=selector_api_endpoint)
-        elif model_type == MODEL_TYPE_OPENAI:
-            raw_response = _call_openai(prompt=selector_prompt, api_key=selector_api_key, model_name=MEME_SELECTOR_MODEL, api_endpoint=selector_api_endpoint, max_tokens=max_tokens)
-        elif model_type == MODEL_TYPE_XAI:
-            raw_response = _call_xai(prompt=selector_prompt, api_key=selector_api_key, model_name=MEME_SELECTOR_MODEL, api_endpoint=selector_api_endpoint, max_tokens=max_tokens)
+        if model_type is ModelType.ANTHROPIC and _CONFIG.meme_selector_tool_use_min_memes > 0 and original_count > _CONFIG.meme_selector_tool_use_min_memes:
+            raw_response = _select_memes_with_tools(prompt, r1_response, catalogue, selector_api_key, selector_api_endpoint, max_tokens)
+        elif model_type is ModelType.ANTHROPIC:
+            raw_response = _call_anthropic(prompt=selector_suffix, api_key=selector_api_key, model_name=selector_model, api_endpoint=selector_api_endpoint, max_tokens=max_tokens, cacheable_prefix=selector_prefix)
+        elif model_type is ModelType.GEMINI:
+            raw_response = _call_gemini(prompt=selector_prompt, api_key=selector_api_key, model_name=selector_model, api_endpoint=selector_api_endpoint)
+        elif model_type is ModelType.OPENAI:
+            raw_response = _call_openai(prompt=selector_prompt, api_key=selector_api_key, model_name=selector_model, api_endpoint=selector_api_endpoint, max_tokens=max_tokens)
+        elif model_type is ModelType.XAI:
+            raw_response = _call_xai(prompt=selector_prompt, api_key=selector_api_key, model_name=selector_model, api_endpoint=selector_api_endpoint, max_tokens=max_tokens)
 
         if not raw_response:
-            logger.warning(f"Meme selector LLM ({MEME_SELECTOR_MODEL}) returned no response.")
+            logger.warning(f"Meme selector LLM ({selector_model}) returned no response.")
             return None
 
         # --- Parse the LLM Response --- 
-        logger.debug(f"Raw response from meme selector ({MEME_SELECTOR_MODEL}): {raw_response[:500]}...")
+        logger.debug("Raw response from meme selector (%s): %.500s...", selector_model, raw_response)
         
-        json_match = re.search(r'```json\s*({.*?})\s*```', raw_response, re.DOTALL)
-        json_str = None
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-             try:
-                 if raw_response.strip().startswith('{') and raw_response.strip().endswith('}'):
-                      test_parse = json.loads(raw_response.strip())
-                      # Basic check if parsed result looks like expected structure
-                      if isinstance(test_parse, dict) and "selected_memes" in test_parse and "reasoning" in test_parse:
-                          json_str = raw_response.strip()
-                      else:
-                          logger.warning(f"Meme selector response parsed as JSON but missing keys. Raw: {raw_response}")
-                 else:
-                      logger.warning(f"Meme selector response doesn't look like JSON or JSON code block. Raw: {raw_response}")
-             except json.JSONDecodeError:
-                 logger.warning(f"Meme selector response is not valid JSON. Raw: {raw_response}")
-
-        if not json_str:
-             logger.error(f"Could not extract valid JSON from meme selector response. Model: {MEME_SELECTOR_MODEL}")
+        json_blob = _extract_json(raw_response)
+        if json_blob is None:
+             logger.error("Could not extract valid JSON from meme selector response. Model: %s. Raw: %s", selector_model, raw_response)
              return None
 
         try:
-            selection_data = json.loads(json_str)
-            parsed_response = MemeSelectionResponse(**selection_data)
+            parsed_response = _parse_meme_selection(json_blob)
             logger.info(f"Successfully parsed meme selection response: Selected {len(parsed_response.selected_memes)} memes.")
             return parsed_response
-        except (json.JSONDecodeError, ValidationError) as e:
-            logger.error(f"Error parsing JSON response from meme selector ({MEME_SELECTOR_MODEL}): {e}. JSON string: '{json_str}'", exc_info=True)
+        except ValidationError as e:
+            logger.error(f"Error parsing JSON response from meme selector ({selector_model}): {e}. JSON string: '{json_blob}'", exc_info=True)
             return None
         
     except Exception as e:
-        logger.error(f"Unexpected error during meme selection call with {MEME_SELECTOR_MODEL}: {e}", exc_info=True)
+        logger.error(f"Unexpected error during meme selection call with {selector_model}: {e}", exc_info=True)
         return None
 
-# --- R2 analysis context size limit ---
-R2_MEME_CONTEXT_MAX_CHARS = int(os.getenv("R2_MEME_CONTEXT_MAX_CHARS", "300"))
+# --- Streaming Helpers ---
+# These yield text chunks as the provider produces them. They are not retried or cached
+# because a partial stream may already have been forwarded to the client.
+
+def _stream_openai(prompt: str, api_key: str, model_name: str, api_endpoint: Optional[str], max_tokens: int) -> Iterator[str]:
+    client = _get_openai_client(api_key, api_endpoint)
+    get_rate_limiter(MODEL_TYPE_OPENAI).acquire(estimate_tokens(prompt, max_tokens))
+    stream = client.chat.completions.create(
+        messages=[{"role": "user", "content": prompt}],
+        model=model_name, max_tokens=max_tokens, stream=True,
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def _stream_anthropic(prompt: str, api_key: str, model_name: str, api_endpoint: Optional[str], max_tokens: int) -> Iterator[str]:
+    client = _get_anthropic_client(api_key, api_endpoint, _resolve_anthropic_api_version(model_name))
+    get_rate_limiter(MODEL_TYPE_ANTHROPIC).acquire(estimate_tokens(prompt, max_tokens))
+    with client.messages.stream(
+        model=model_name, max_tokens=max_tokens,
+        system="You are a helpful, harmless, and honest AI assistant.",
+        messages=[{"role": "user", "content": prompt}],
+    ) as stream:
+        for text in stream.text_stream:
+            yield text
+
+def _stream_gemini(prompt: str, api_key: str, model_name: str, api_endpoint: Optional[str], max_tokens: int) -> Iterator[str]:
+    model = _get_gemini_model(api_key, model_name, api_endpoint)
+    get_rate_limiter(MODEL_TYPE_GEMINI).acquire(estimate_tokens(prompt, max_tokens))
+    response = model.generate_content(
+        prompt,
+        safety_settings=config.DEFAULT_GEMINI_SAFETY_SETTINGS,
+        generation_config={"max_output_tokens": max_tokens},
+        stream=True,
+    )
+    for chunk in response:
+        for candidate in chunk.candidates or []:
+            for part in getattr(candidate.content, "parts", None) or []:
+                if getattr(part, "text", None):
+                    yield part.text
+
+def _stream_xai(prompt: str, api_key: str, model_name: str, api_endpoint: Optional[str], max_tokens: int) -> Iterator[str]:
+    base_url = api_endpoint or "https://api.x.ai/v1"
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    payload = {
+        "model": model_name,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": max_tokens,
+        "temperature": 0.7,
+        "stream": True,
+    }
+    get_rate_limiter(MODEL_TYPE_XAI).acquire(estimate_tokens(prompt, max_tokens))
+    with _get_http_client(base_url).stream("POST", "/chat/completions", headers=headers, content=orjson.dumps(payload)) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            choices = orjson.loads(data).get("choices") or []
+            content = choices[0].get("delta", {}).get("content") if choices else None
+            if content:
+                yield content
+
+# --- Model Dispatch Tables ---
+# Built once from the config model lists: one dict lookup per call instead of an
+# if/elif chain of list membership tests.
+
+# Per-provider handlers, indexed by config.ModelType.
+_CALL_HANDLERS: Tuple[Callable[..., Optional[str]], ...] = (_call_openai, _call_gemini, _call_anthropic, _call_xai)
+_STREAM_HANDLERS: Tuple[Callable[..., Iterator[str]], ...] = (_stream_openai, _stream_gemini, _stream_anthropic, _stream_xai)
+
+def _build_dispatch(max_tokens: int) -> Dict[str, Tuple[Callable[..., Optional[str]], Dict[str, Any]]]:
+    return {
+        model: (_CALL_HANDLERS[model_type], {} if model_type is ModelType.GEMINI else {"max_tokens": max_tokens})
+        for model, model_type in config.MODEL_TYPE_MAP.items()
+    }
+
+_MODEL_DISPATCH = _build_dispatch(max_tokens=_CONFIG.default_max_tokens)
+_ANALYSIS_DISPATCH = _build_dispatch(max_tokens=_CONFIG.analysis_max_tokens)
+
+_STREAM_DISPATCH: Dict[str, Callable[..., Iterator[str]]] = {
+    model: _STREAM_HANDLERS[model_type] for model, model_type in config.MODEL_TYPE_MAP.items()
+}
 
 # --- Main Interface Functions ---
 
@@ -563,18 +1117,167 @@ def generate_response(prompt: str, api_key: str, model_name: str, api_endpoint:
         The generated text response, or None if an error occurred or content was blocked.
     """
     logger.info(f"Generating response using model: {model_name}")
-    
-    model_type = None
-    if model_name in config.OPENAI_MODELS: model_type = MODEL_TYPE_OPENAI
-    elif model_name in config.GEMINI_MODELS: model_type = MODEL_TYPE_GEMINI
-    elif model_name in config.ANTHROPIC_MODELS: model_type = MODEL_TYPE_ANTHROPIC
-    elif model_name in config.XAI_MODELS: model_type = MODEL_TYPE_XAI
-        
-    if model_type == MODEL_TYPE_OPENAI: return _call_openai(prompt, api_key, model_name, api_endpoint, max_tokens=2048)
-    elif model_type == MODEL_TYPE_GEMINI: return _call_gemini(prompt, api_key, model_name, api_endpoint)
-    elif model_type == MODEL_TYPE_ANTHROPIC: return _call_anthropic(prompt, api_key, model_name, api_endpoint, max_tokens=2048)
-    elif model_type == MODEL_TYPE_XAI: return _call_xai(prompt, api_key, model_name, api_endpoint, max_tokens=2048)
-    else: logger.error(f"Unsupported model specified in generate_response: {model_name}"); return None
+
+    func, kwargs = _MODEL_DISPATCH.get(model_name, (None, None))
+    if func is None: logger.error(f"Unsupported model specified in generate_response: {model_name}"); return None
+    return func(prompt, api_key, model_name, api_endpoint, **kwargs)
+
+def stream_response(
+    prompt: str, api_key: str, model_name: str, api_endpoint: Optional[str] = None, max_tokens: int = 2048
+) -> Iterator[str]:
+    """Streams a response from the specified model as text chunks.
+
+    Provider errors are logged and re-raised, so consumers can tell an aborted stream from
+    a completed one. An unsupported model raises ValueError before anything is yielded.
+    """
+    logger.info(f"Streaming response using model: {model_name}")
+
+    streamer = _STREAM_DISPATCH.get(model_name)
+    if streamer is None:
+        logger.error(f"Unsupported model specified in stream_response: {model_name}")
+        raise ValueError(f"Unsupported model: {model_name}")
+
+    try:
+        yield from streamer(prompt, api_key, model_name, api_endpoint, max_tokens)
+    except Exception as e:
+        logger.error(f"Error while streaming from model {model_name}: {e}. Prompt (start): {prompt[:100]}...", exc_info=True)
+        raise
+
+# Shared worker pool for issuing independent LLM calls concurrently from sync code.
+# The SDKs release the GIL while waiting on the network, so calls overlap.
+_LLM_EXECUTOR = ThreadPoolExecutor(max_workers=config.LLM_WORKERS, thread_name_prefix="llm")
+
+def call_many(tasks: List[Tuple[Callable[..., Optional[str]], Dict[str, Any]]]) -> List[Optional[str]]:
+    """Runs (function, kwargs) LLM tasks concurrently and returns their results in order.
+
+    Wall-clock time is that of the slowest call rather than the sum. A task that raises
+    is logged and yields None, matching how the individual helpers report failures.
+    Calls still pass through the per-provider rate limiters, so bursts are smoothed.
+    """
+    futures = [_LLM_EXECUTOR.submit(func, **kwargs) for func, kwargs in tasks]
+    results: List[Optional[str]] = []
+    for (func, _), future in zip(tasks, futures):
+        try:
+            results.append(future.result())
+        except Exception as e:
+            logger.error(f"Concurrent LLM task {getattr(func, '__name__', func)} failed: {e}", exc_info=True)
+            results.append(None)
+    return results
+
+def generate_responses_batch(
+    prompts: List[str], api_key: str, model_name: str, api_endpoint: Optional[str] = None
+) -> List[Optional[str]]:
+    """Generates responses for many prompts with the same model, concurrently.
+
+    Results are returned in prompt order, with None for any prompt that failed. Concurrency
+    is bounded by the shared worker pool and the provider's rate limiter, and identical
+    prompts are served from the LLM cache.
+    """
+    if model_name not in _MODEL_DISPATCH:
+        logger.error(f"Unsupported model specified in generate_responses_batch: {model_name}")
+        return [None] * len(prompts)
+    logger.info(f"Generating {len(prompts)} responses concurrently using model: {model_name}")
+    return call_many([
+        (generate_response, {"prompt": prompt, "api_key": api_key, "model_name": model_name, "api_endpoint": api_endpoint})
+        for prompt in prompts
+    ])
+
+# Fraction of a model's context window the analysis prompt may use; estimate_tokens is a
+# character-based heuristic, so leave headroom for tokenizers that are less generous
+ANALYSIS_CONTEXT_SAFETY_MARGIN = 0.9
+_TRUNCATION_MARKER = "\n\n[... truncated to fit the analysis model's context window ...]\n\n"
+
+def _truncate_middle(text: str, chars_to_remove: int) -> str:
+    """Removes ``chars_to_remove`` characters from the middle of ``text``, keeping its head and tail."""
+    keep = max(0, len(text) - chars_to_remove - len(_TRUNCATION_MARKER))
+    head = keep // 2
+    return text[:head] + _TRUNCATION_MARKER + text[len(text) - (keep - head):]
+
+@functools.lru_cache(maxsize=1024)
+def _render_meme_context(names: Tuple[str, ...], max_chars: int) -> str:
+    """Renders the R2 meme-context section, cached because selections repeat across analyses.
+
+    Names are appended one at a time, keeping room for the truncation marker, so truncation
+    never splits a name. The result, header included, never exceeds ``max_chars``.
+    """
+    marker = "\n[... truncated meme context ...]"
+    parts = ["\n\n**Potentially Relevant Ethical Memes Identified:**"]
+    running = len(parts[0])
+    last = len(names) - 1
+    for i, name in enumerate(names):
+        segment = "\n- " + name
+        # The final name needs no room for the marker after it
+        if running + len(segment) + (0 if i == last else len(marker)) > max_chars:
+            parts.append(marker)
+            logger.info(f"Truncated meme context to {max_chars} characters.")
+            break
+        parts.append(segment)
+        running += len(segment)
+    # Clamp in case the header and marker alone do not fit
+    return "".join(parts)[:max(max_chars, 0)]
+
+def fetch_pvb_context(pvb_data_hash: Optional[str]) -> str:
+    """Queries the PVB oracle for the verification data behind ``pvb_data_hash``.
+
+    Returns the prompt section to append to the analysis context, or an empty string if
+    there is no hash or the oracle could not be reached.
+    """
+    if not pvb_data_hash:
+        return ''
+    try:
+        import requests
+        oracle_url = f'http://oracle_bridge:3000/verify_pvb_data?data_hash={pvb_data_hash}'
+        response = requests.get(oracle_url, timeout=5)
+        if response.status_code == 200:
+            verification_data = response.json()
+            logger.info(f'Added PVB verification context to analysis prompt')
+            return f'\n\n**Physical Verification Data:**\n{json.dumps(verification_data, indent=2)}'
+        logger.warning(f'Failed to get PVB verification: {response.status_code}')
+    except Exception as e:
+        logger.error(f'Error querying PVB oracle: {e}')
+    return ''
+
+def warm_up_analysis(analysis_api_key: str, analysis_model_name: str, analysis_api_endpoint: Optional[str] = None) -> None:
+    """Prepares everything R2 needs that does not depend on R1.
+
+    Loads and compiles the analysis template and creates the provider client, so the R2
+    call does not pay for them once R1 is done. Safe to run concurrently with R1.
+    """
+    template = _load_prompt_template(config.ETHICAL_ANALYSIS_PROMPT_FILENAME)
+    if template:
+        for part in _split_template_prefix(template):
+            _compile_template(part)
+    model_type = config.MODEL_TYPE_MAP.get(analysis_model_name)
+    try:
+        if model_type is ModelType.OPENAI:
+            _get_openai_client(analysis_api_key, analysis_api_endpoint)
+        elif model_type is ModelType.ANTHROPIC:
+            _get_anthropic_client(analysis_api_key, analysis_api_endpoint, _resolve_anthropic_api_version(analysis_model_name))
+        elif model_type is ModelType.GEMINI:
+            _get_gemini_model(analysis_api_key, analysis_model_name, analysis_api_endpoint)
+        elif model_type is ModelType.XAI:
+            _get_http_client(analysis_api_endpoint or "https://api.x.ai/v1")
+    except Exception as e:
+        logger.warning(f"Could not warm up analysis client for {analysis_model_name}: {e}")
+
+def generate_responses_across_models(
+    prompt: str, models: List[Tuple[str, str, Optional[str]]]
+) -> Dict[str, Optional[str]]:
+    """Generates responses to one prompt from several models at once, for side-by-side comparison.
+
+    Args:
+        prompt: The prompt sent to every model.
+        models: (model_name, api_key, api_endpoint) tuples.
+
+    Returns:
+        A dict mapping each model name to its response (None on failure), in the given order.
+        Wall time is that of the slowest model rather than the sum.
+    """
+    results = call_many([
+        (generate_response, {"prompt": prompt, "api_key": api_key, "model_name": model_name, "api_endpoint": api_endpoint})
+        for model_name, api_key, api_endpoint in models
+    ])
+    return {model_name: result for (model_name, _, _), result in zip(models, results)}
 
 def perform_ethical_analysis(
     initial_prompt: str,
@@ -584,7 +1287,8 @@ def perform_ethical_analysis(
     analysis_model_name: str,
     analysis_api_endpoint: Optional[str] = None,
     selected_meme_names: Optional[List[str]] = None,
-    pvb_data_hash: Optional[str] = None  # New optional parameter
+    pvb_data_hash: Optional[str] = None,  # New optional parameter
+    pvb_context: Optional[str] = None
 ) -> Optional[str]:
     """Performs ethical analysis using an LLM based on prompt, response, and ontology.
 
@@ -597,6 +1301,8 @@ def perform_ethical_analysis(
         analysis_api_endpoint: Optional API endpoint for the analysis LLM.
         selected_meme_names: Optional list of relevant meme names identified for context.
         pvb_data_hash: Optional hash of physical verification data to include in the prompt.
+        pvb_context: Optional verification context already fetched with fetch_pvb_context;
+            when given, the oracle is not queried again.
 
     Returns:
         The raw text response from the analysis LLM, or None if an error occurs.
@@ -609,43 +1315,44 @@ def perform_ethical_analysis(
     
     meme_context = ""
     if selected_meme_names:
-        meme_context = "\n\n**Potentially Relevant Ethical Memes Identified:**\n- " + "\n- ".join(selected_meme_names)
         logger.info(f"Adding {len(selected_meme_names)} selected memes to analysis context.")
-        if len(meme_context) > config.R2_MEME_CONTEXT_MAX_CHARS:
-            meme_context = meme_context[:config.R2_MEME_CONTEXT_MAX_CHARS] + "\n[... truncated meme context ...]"
-            logger.info(f"Truncated meme context to {config.R2_MEME_CONTEXT_MAX_CHARS} characters.")
+        meme_context = _render_meme_context(tuple(selected_meme_names), _CONFIG.r2_meme_context_max_chars)
 
-    pvb_context = ''
-    if pvb_data_hash:
-        try:
-            import requests
-            oracle_url = f'http://oracle_bridge:3000/verify_pvb_data?data_hash={pvb_data_hash}'
-            response = requests.get(oracle_url, timeout=5)
-            if response.status_code == 200:
-                verification_data = response.json()
-                pvb_context = f'\n\n**Physical Verification Data:**\n{json.dumps(verification_data, indent=2)}'
-                logger.info(f'Added PVB verification context to analysis prompt')
-            else:
-                logger.warning(f'Failed to get PVB verification: {response.status_code}')
-        except Exception as e:
-            logger.error(f'Error querying PVB oracle: {e}')
-    
-    formatted_prompt = analysis_prompt_template.format(
+    if pvb_context is None:
+        pvb_context = fetch_pvb_context(pvb_data_hash)
+
+    func, kwargs = _ANALYSIS_DISPATCH.get(analysis_model_name, (None, None))
+    if func is None: logger.error(f"Unsupported model specified in perform_ethical_analysis: {analysis_model_name}"); return None
+
+    # The template leads with static instructions and the ontology so that prefix is
+    # identical across requests and eligible for provider-side prompt caching.
+    template_values = dict(
         initial_prompt=initial_prompt, generated_response=generated_response,
         ontology=ontology, meme_context=meme_context + pvb_context
     )
+    prefix_template, request_template = _split_template_prefix(analysis_prompt_template)
+    static_prefix = _compile_template(prefix_template)(**template_values)
+    request_prompt = _compile_template(request_template)(**template_values)
+
+    # Check the context budget locally rather than paying for a round-trip that the
+    # provider would reject (or silently truncate). R1 is trimmed from the middle first.
+    context_window = config.MODEL_CONTEXT_WINDOWS.get(analysis_model_name)
+    if context_window:
+        budget = int(context_window * ANALYSIS_CONTEXT_SAFETY_MARGIN)
+        overflow = estimate_tokens(static_prefix + request_prompt, kwargs.get("max_tokens")) - budget
+        if overflow > 0:
+            chars_to_remove = overflow * 4
+            if chars_to_remove >= len(generated_response):
+                logger.error(f"Analysis prompt exceeds the {analysis_model_name} context window by ~{overflow} tokens even without R1. Aborting.")
+                return None
+            logger.warning(f"Analysis prompt exceeds the {analysis_model_name} context budget by ~{overflow} tokens; trimming R1.")
+            template_values["generated_response"] = _truncate_middle(generated_response, chars_to_remove)
+            request_prompt = _compile_template(request_template)(**template_values)
 
-    model_type = None
-    if analysis_model_name in config.OPENAI_MODELS: model_type = MODEL_TYPE_OPENAI
-    elif analysis_model_name in config.GEMINI_MODELS: model_type = MODEL_TYPE_GEMINI
-    elif analysis_model_name in config.ANTHROPIC_MODELS: model_type = MODEL_TYPE_ANTHROPIC
-    elif analysis_model_name in config.XAI_MODELS: model_type = MODEL_TYPE_XAI
-
-    if model_type == MODEL_TYPE_OPENAI: return _call_openai(formatted_prompt, analysis_api_key, analysis_model_name, analysis_api_endpoint, max_tokens=4096)
-    elif model_type == MODEL_TYPE_GEMINI: return _call_gemini(formatted_prompt, analysis_api_key, analysis_model_name, analysis_api_endpoint)
-    elif model_type == MODEL_TYPE_ANTHROPIC: return _call_anthropic(formatted_prompt, analysis_api_key, analysis_model_name, analysis_api_endpoint, max_tokens=4096)
-    elif model_type == MODEL_TYPE_XAI: return _call_xai(formatted_prompt, analysis_api_key, analysis_model_name, analysis_api_endpoint, max_tokens=4096)
-    else: logger.error(f"Unsupported model specified in perform_ethical_analysis: {analysis_model_name}"); return None
+    if func is _call_anthropic and static_prefix:
+        return func(request_prompt, analysis_api_key, analysis_model_name, analysis_api_endpoint,
+                    cacheable_prefix=static_prefix, **kwargs)
+    return func(static_prefix + request_prompt, analysis_api_key, analysis_model_name, analysis_api_endpoint, **kwargs)
 
 # Example usage (for testing this module directly)
 if __name__ == '__main__':
@@ -654,23 +1361,21 @@ if __name__ == '__main__':
 
     test_prompt = "Explain the concept of ethical memetics briefly."
 
-    # --- Test Gemini --- 
+    # --- Test Gemini and Anthropic concurrently ---
+    test_models = []
     gemini_key = os.getenv("GEMINI_API_KEY")
     gemini_model = "gemini-1.5-flash-latest"
     if not gemini_key: logger.warning("GEMINI_API_KEY not set. Skipping Gemini tests.")
-    else:
-        logger.info(f"--- Testing Gemini ({gemini_model}) ---")
-        r1_gemini = generate_response(test_prompt, gemini_key, gemini_model)
-        if r1_gemini: logger.info(f"Gemini Response (R1):\n{r1_gemini}")
-        else: logger.warning("Failed to get Gemini response (R1).")
+    else: test_models.append((gemini_model, gemini_key, None))
 
-    # --- Test Anthropic --- 
     anthropic_key = os.getenv("ANTHROPIC_API_KEY")
     anthropic_model = "claude-3-haiku-20240307"
     if not anthropic_key: logger.warning("ANTHROPIC_API_KEY not set. Skipping Anthropic tests.")
-    else:
-        logger.info(f"--- Testing Anthropic ({anthropic_model}) ---")
-        r1_anthropic = generate_response(test_prompt, anthropic_key, anthropic_model)
-        if r1_anthropic: logger.info(f"Anthropic Response (R1):\n{r1_anthropic}")
-        else: logger.warning("Failed to get Anthropic response (R1).")
+    else: test_models.append((anthropic_model, anthropic_key, None))
+
+    if test_models:
+        logger.info(f"--- Testing {', '.join(model for model, _, _ in test_models)} ---")
+        for model, r1 in generate_responses_across_models(test_prompt, test_models).items():
+            if r1: logger.info(f"{model} Response (R1):\n{r1}")
+            else: logger.warning(f"Failed to get {model} response (R1).")
 
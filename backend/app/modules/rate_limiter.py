@@ -0,0 +1,101 @@
+"""Client-side request/token budgets for LLM providers."""
+
+import logging
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+from .. import config
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Bucket refilled continuously at ``capacity`` units per minute.
+
+    ``reserve`` debits immediately (the level may go negative) and returns how long
+    the caller must wait for the debt to be repaid, so waiting happens outside the lock.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def cap(self, remaining: float, now: float) -> None:
+        self._refill(now)
+        self.level = min(self.level, remaining)
+
+
+class ProviderRateLimiter:
+    """Requests-per-minute and tokens-per-minute budget for one provider (0 disables a budget)."""
+
+    def __init__(self, name: str, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._lock = threading.Lock()
+
+    def acquire(self, estimated_tokens: int) -> float:
+        """Blocks until the call fits in the budget and returns the seconds waited."""
+        if self.requests is None and self.tokens is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.reserve(estimated_tokens, now))
+        if wait > 0:
+            logger.info(f"Rate limiter for {self.name}: waiting {wait:.2f}s before calling the API.")
+            time.sleep(wait)
+        return wait
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Shrinks the local budget to what the provider reports as remaining.
+
+        Reads the OpenAI/xAI ``x-ratelimit-remaining-*`` headers and Anthropic's
+        ``anthropic-ratelimit-*-remaining`` equivalents.
+        """
+        updates = (
+            (self.requests, headers.get("x-ratelimit-remaining-requests") or headers.get("anthropic-ratelimit-requests-remaining")),
+            (self.tokens, headers.get("x-ratelimit-remaining-tokens") or headers.get("anthropic-ratelimit-tokens-remaining")),
+        )
+        with self._lock:
+            now = time.monotonic()
+            for bucket, remaining in updates:
+                if bucket is None or remaining is None:
+                    continue
+                try:
+                    bucket.cap(float(remaining), now)
+                except ValueError:
+                    continue
+
+
+def estimate_tokens(prompt: str, max_tokens: Optional[int]) -> int:
+    """Rough token cost of a call: ~4 characters per prompt token plus the completion budget."""
+    return len(prompt) // 4 + (max_tokens or 0)
+
+
+_LIMITERS: Dict[str, ProviderRateLimiter] = {
+    provider: ProviderRateLimiter(provider, rpm, tpm)
+    for provider, (rpm, tpm) in config.LLM_RATE_LIMITS.items()
+}
+
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    limiter = _LIMITERS.get(provider)
+    if limiter is None:
+        limiter = _LIMITERS.setdefault(provider, ProviderRateLimiter(provider))
+    return limiter
@@ -0,0 +1,61 @@
+"""Exponential backoff with jitter for transient LLM provider failures."""
+
+import logging
+import random
+import time
+from typing import Callable, Optional, TypeVar
+
+from .. import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504, 529})
+
+
+def _retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Reads a numeric Retry-After header from the exception's HTTP response, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, initial: float, maximum: float) -> float:
+    """Full-jitter delay for the given (1-based) attempt: uniform in [0, min(max, initial * 2**(n-1))]."""
+    return random.uniform(0, min(maximum, initial * (2 ** (attempt - 1))))
+
+
+def call_with_retries(
+    send: Callable[[], T],
+    is_retryable: Callable[[BaseException], bool],
+    description: str,
+    max_attempts: Optional[int] = None,
+    initial_delay: float = 1.0,
+    max_delay: float = 30.0,
+) -> T:
+    """Calls ``send`` and retries transient failures, honouring Retry-After when present.
+
+    Non-retryable errors, and the last error once attempts are exhausted, are re-raised
+    so the caller's existing error handling still applies.
+    """
+    attempts = max_attempts if max_attempts is not None else config.LLM_RETRY_MAX_ATTEMPTS
+    attempt = 1
+    while True:
+        try:
+            return send()
+        except Exception as exc:
+            if attempt >= attempts or not is_retryable(exc):
+                raise
+            retry_after = _retry_after_seconds(exc)
+            delay = min(retry_after, max_delay) if retry_after is not None else backoff_delay(attempt, initial_delay, max_delay)
+            logger.warning(
+                f"Transient error from {description} (attempt {attempt}/{attempts}): {exc}. Retrying in {delay:.2f}s."
+            )
+            time.sleep(delay)
+            attempt += 1
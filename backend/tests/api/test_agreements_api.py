@@ -1,33 +1,61 @@
-import json
+import orjson
+from collections import defaultdict
 from types import SimpleNamespace
 from bson import ObjectId
 
 
 class FakeCursor:
+    """Records sort() like a Mongo cursor and only sorts when iterated."""
+
     def __init__(self, items):
         self.items = items
+        self._sort = None
 
     def sort(self, key, direction):
-        reverse = direction == -1
-        self.items = sorted(self.items, key=lambda item: item.get(key), reverse=reverse)
+        self._sort = (key, direction)
         return self
 
+    def __len__(self):
+        return len(self.items)
+
     def __iter__(self):
+        if self._sort is not None and len(self.items) > 1:
+            key, direction = self._sort
+            self.items.sort(key=lambda item: item.get(key), reverse=direction == -1)
+            self._sort = None
         return iter(self.items)
 
 
 class FakeCollection:
+    """In-memory collection indexed by _id and by the fields the API queries on."""
+
+    INDEXED_FIELDS = ("agreement_id", "status")
+
     def __init__(self):
         self.items = []
+        self.by_id = {}
+        self.indexes = {field: defaultdict(list) for field in self.INDEXED_FIELDS}
 
     def insert_one(self, document):
         doc = document.copy()
         doc.setdefault("_id", ObjectId())
         self.items.append(doc)
+        self.by_id[doc["_id"]] = doc
+        for field, index in self.indexes.items():
+            index[doc.get(field)].append(doc)
         return SimpleNamespace(inserted_id=doc["_id"])
 
+    def _candidates(self, query):
+        if "_id" in query:
+            doc = self.by_id.get(query["_id"])
+            return [doc] if doc is not None else []
+        for field, index in self.indexes.items():
+            if field in query:
+                return index.get(query[field], [])
+        return self.items
+
     def find_one(self, query):
-        for doc in self.items:
+        for doc in self._candidates(query):
             if all(doc.get(key) == value for key, value in query.items()):
                 return doc
         return None
@@ -37,11 +65,15 @@ class FakeCollection:
         if not doc:
             return SimpleNamespace(matched_count=0)
         updates = update.get("$set", {})
+        for field, index in self.indexes.items():
+            if field in updates and updates[field] != doc.get(field):
+                index[doc.get(field)].remove(doc)
+                index[updates[field]].append(doc)
         doc.update(updates)
         return SimpleNamespace(matched_count=1)
 
     def find(self, query):
-        results = [doc for doc in self.items if all(doc.get(key) == value for key, value in query.items())]
+        results = [doc for doc in self._candidates(query) if all(doc.get(key) == value for key, value in query.items())]
         return FakeCursor(results)
 
     def create_index(self, *args, **kwargs):
@@ -68,9 +100,9 @@ def _create_agreement(test_client, status="proposed"):
         "model_id": "model-x",
         "model_version": "v1",
     }
-    response = test_client.post('/api/agreements', data=json.dumps(payload), content_type='application/json')
+    response = test_client.post('/api/agreements', data=orjson.dumps(payload), content_type='application/json')
     assert response.status_code == 201
-    data = json.loads(response.data.decode('utf-8'))
+    data = orjson.loads(response.data)
     return data["agreement"]
 
 
@@ -81,12 +113,12 @@ def test_accept_proposed_agreement(test_client):
     action_payload = {"action": "accept", "actor_party_id": "requester"}
     response = test_client.post(
         f"/api/agreements/{agreement['id']}/actions",
-        data=json.dumps(action_payload),
+        data=orjson.dumps(action_payload),
         content_type='application/json',
     )
 
     assert response.status_code == 200
-    data = json.loads(response.data.decode('utf-8'))
+    data = orjson.loads(response.data)
     assert data["agreement"]["status"] == "active"
 
 
@@ -97,12 +129,12 @@ def test_decline_proposed_agreement(test_client):
     action_payload = {"action": "decline", "actor_party_id": "requester"}
     response = test_client.post(
         f"/api/agreements/{agreement['id']}/actions",
-        data=json.dumps(action_payload),
+        data=orjson.dumps(action_payload),
         content_type='application/json',
     )
 
     assert response.status_code == 200
-    data = json.loads(response.data.decode('utf-8'))
+    data = orjson.loads(response.data)
     assert data["agreement"]["status"] == "rejected"
 
 
@@ -120,12 +152,12 @@ def test_counter_supersedes_agreement(test_client):
 
     response = test_client.post(
         f"/api/agreements/{agreement['id']}/actions",
-        data=json.dumps(action_payload),
+        data=orjson.dumps(action_payload),
         content_type='application/json',
     )
 
     assert response.status_code == 200
-    data = json.loads(response.data.decode('utf-8'))
+    data = orjson.loads(response.data)
     assert data["agreement"]["status"] == "superseded"
     assert data["counter_agreement"]["status"] == "proposed"
     assert data["counter_agreement"]["supersedes_agreement_id"] == agreement["id"]
@@ -138,7 +170,7 @@ def test_invalid_transition_on_draft(test_client):
     action_payload = {"action": "accept", "actor_party_id": "requester"}
     response = test_client.post(
         f"/api/agreements/{agreement['id']}/actions",
-        data=json.dumps(action_payload),
+        data=orjson.dumps(action_payload),
         content_type='application/json',
     )
 
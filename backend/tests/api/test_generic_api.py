@@ -1,21 +1,71 @@
 # backend/tests/api/test_generic_api.py
-import json
-from app.config import ALL_MODELS # Import from your new config
+import orjson
+from app.config import ALL_MODELS, ALL_MODELS_SET # Import from your new config
 
 def test_health_check(test_client):
     """Test the /api/health endpoint."""
     response = test_client.get('/api/health')
     assert response.status_code == 200
-    data = json.loads(response.data.decode('utf-8'))
+    data = orjson.loads(response.data)
     assert data['status'] == 'healthy'
     assert 'database' in data
     assert 'services' in data
+    assert set(data['llm_cache']) == {'hits', 'misses', 'size'}
 
 def test_get_models(test_client):
     """Test the /api/models endpoint."""
     response = test_client.get('/api/models')
     assert response.status_code == 200
-    data = json.loads(response.data.decode('utf-8'))
+    data = orjson.loads(response.data)
     assert 'models' in data
     assert isinstance(data['models'], list)
-    assert set(data['models']) == set(ALL_MODELS) # Check against config 
\ No newline at end of file
+    assert frozenset(data['models']) == ALL_MODELS_SET # Check against config
+
+def test_analyze_stream_emits_server_sent_events(test_client, monkeypatch):
+    """Test the /api/analyze/stream endpoint forwards R1 chunks as SSE events."""
+    from app import api
+    monkeypatch.setattr(api, "stream_response", lambda **kwargs: iter(["Hello", " world"]))
+
+    response = test_client.post(
+        '/api/analyze/stream',
+        data=orjson.dumps({"prompt": "Hi", "origin_model": ALL_MODELS[0], "origin_api_key": "test-key"}),
+        content_type='application/json',
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    body = response.data.decode('utf-8')
+    assert 'data: {"text": "Hello"}' in body
+    assert 'data: {"text": " world"}' in body
+    assert body.endswith("event: done\ndata: {}\n\n")
+
+
+def test_analyze_stream_reports_aborted_streams_as_errors(test_client, monkeypatch):
+    """A provider failure mid-stream or an empty stream ends with an error event, not done."""
+    from app import api
+
+    def failing_stream(**kwargs):
+        yield "Hello"
+        raise RuntimeError("provider disconnected")
+
+    payload = orjson.dumps({"prompt": "Hi", "origin_model": ALL_MODELS[0], "origin_api_key": "test-key"})
+    for stream in (failing_stream, lambda **kwargs: iter([])):
+        monkeypatch.setattr(api, "stream_response", stream)
+
+        body = test_client.post('/api/analyze/stream', data=payload, content_type='application/json').data.decode('utf-8')
+
+        assert "event: error\ndata: " in body
+        assert "event: done" not in body
+
+
+def test_json_provider_matches_flask_defaults(test_client):
+    """The orjson provider keeps Flask's sorted keys, HTTP-date datetimes and trailing newline."""
+    from datetime import datetime, timezone
+    from app.json_provider import OrjsonProvider
+
+    app = test_client.application
+    assert isinstance(app.json, OrjsonProvider)
+
+    response = app.json.response({"b": 1, "a": datetime(2024, 1, 2, tzinfo=timezone.utc)})
+    assert response.data == b'{"a":"Tue, 02 Jan 2024 00:00:00 GMT","b":1}\n'
+    assert app.json.loads(b'{"x": [1, 2]}') == {"x": [1, 2]}
@@ -0,0 +1,277 @@
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+
+class FakeCollection:
+    def __init__(self):
+        self.items = []
+
+    def insert_one(self, document):
+        doc = dict(document)
+        doc.setdefault("_id", ObjectId())
+        self.items.append(doc)
+        return SimpleNamespace(inserted_id=doc["_id"], acknowledged=True)
+
+    def insert_many(self, documents, ordered=True):
+        # Mirrors the unique name index: duplicates are reported as write errors
+        inserted, write_errors = [], []
+        for index, document in enumerate(documents):
+            if self.find_one({"name": document["name"]}):
+                write_errors.append({"index": index, "code": 11000, "errmsg": "duplicate key"})
+                continue
+            inserted.append(self.insert_one(document).inserted_id)
+        if write_errors:
+            raise BulkWriteError({"nInserted": len(inserted), "writeErrors": write_errors})
+        return SimpleNamespace(inserted_ids=inserted, acknowledged=True)
+
+    def find_one(self, query, projection=None):
+        return next(self.find(query, projection), None)
+
+    def find(self, query=None, projection=None):
+        query = query or {}
+        return iter([_project(doc, projection) for doc in self.items if all(_matches(doc.get(key), value) for key, value in query.items())])
+
+    def create_index(self, *args, **kwargs):
+        return "idx"
+
+    def index_information(self):
+        return {
+            "_id_": {"key": [("_id", 1)]},
+            "name_unique_idx": {"key": [("name", 1)], "unique": True},
+        }
+
+
+class UnindexedCollection(FakeCollection):
+    """A collection whose unique name index was never created: inserts are not deduplicated."""
+
+    def insert_many(self, documents, ordered=True):
+        return SimpleNamespace(inserted_ids=[self.insert_one(document).inserted_id for document in documents], acknowledged=True)
+
+    def index_information(self):
+        return {"_id_": {"key": [("_id", 1)]}}
+
+
+def _project(doc, projection):
+    if not projection:
+        return doc
+    return {key: value for key, value in doc.items() if key == "_id" or key in projection}
+
+
+def _matches(actual, expected):
+    if isinstance(expected, dict) and "$in" in expected:
+        return actual in expected["$in"]
+    return actual == expected
+
+
+class FakeDB:
+    def __init__(self):
+        self.ethical_memes = FakeCollection()
+
+
+def _setup_fake_db(test_client):
+    fake_db = FakeDB()
+    test_client.application.db = fake_db
+    return fake_db
+
+
+def _insert_meme(fake_db, name="Golden Rule"):
+    target_id = ObjectId()
+    result = fake_db.ethical_memes.insert_one({
+        "name": name,
+        "description": "Treat others as you would like to be treated.",
+        "ethical_dimension": ["Deontology"],
+        "source_concept": "Reciprocity",
+        "morphisms": [{"type": "Universalizes", "target_meme_id": target_id}],
+        "metadata": {"created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 1), "version": 1},
+    })
+    return result.inserted_id, target_id
+
+
+def test_get_memes_serializes_object_ids(test_client):
+    fake_db = _setup_fake_db(test_client)
+    meme_id, target_id = _insert_meme(fake_db)
+
+    response = test_client.get('/api/memes/')
+
+    assert response.status_code == 200
+    data = json.loads(response.data.decode('utf-8'))
+    assert len(data) == 1
+    assert data[0]["_id"] == str(meme_id)
+    assert data[0]["morphisms"][0]["target_meme_id"] == str(target_id)
+    assert data[0]["metadata"]["created_at"].startswith("2024-01-01T00:00:00")
+
+
+def test_get_memes_fills_defaults_and_hides_internal_fields(test_client):
+    fake_db = _setup_fake_db(test_client)
+    fake_db.ethical_memes.insert_one({
+        "name": "Legacy Meme",
+        "description": "Stored before keywords and morphisms existed.",
+        "ethical_dimension": ["Virtue"],
+        "source_concept": "Character",
+        "metadata": {"created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 1), "version": 1},
+        "internal_note": "not for the dashboard",
+    })
+    fake_db.ethical_memes.insert_one({"name": "Broken Meme"})
+
+    response = test_client.get('/api/memes/')
+
+    assert response.status_code == 200
+    data = json.loads(response.data.decode('utf-8'))
+    assert [meme["name"] for meme in data] == ["Legacy Meme"]
+    assert data[0]["keywords"] == [] and data[0]["morphisms"] == [] and data[0]["is_merged_token"] is False
+    assert "internal_note" not in data[0]
+
+
+def test_get_meme_by_id(test_client):
+    fake_db = _setup_fake_db(test_client)
+    meme_id, _ = _insert_meme(fake_db)
+
+    response = test_client.get(f'/api/memes/{meme_id}')
+
+    assert response.status_code == 200
+    data = json.loads(response.data.decode('utf-8'))
+    assert data["_id"] == str(meme_id)
+    assert data["name"] == "Golden Rule"
+
+
+def test_get_meme_not_found(test_client):
+    _setup_fake_db(test_client)
+
+    response = test_client.get(f'/api/memes/{ObjectId()}')
+
+    assert response.status_code == 404
+
+
+def test_populate_memes_inserts_seed_once(test_client):
+    fake_db = _setup_fake_db(test_client)
+
+    first = test_client.post('/api/memes/populate')
+    assert first.status_code == 200
+    inserted = len(fake_db.ethical_memes.items)
+    assert inserted > 0
+    assert all(isinstance(doc["metadata"]["created_at"], datetime) for doc in fake_db.ethical_memes.items)
+
+    second = test_client.post('/api/memes/populate')
+    assert second.status_code == 200
+    assert len(fake_db.ethical_memes.items) == inserted
+    assert f"Skipped (already exists): {inserted}" in json.loads(second.data.decode('utf-8'))["message"]
+
+
+def test_populate_memes_skips_existing_without_unique_index(test_client):
+    fake_db = _setup_fake_db(test_client)
+    fake_db.ethical_memes = UnindexedCollection()
+
+    assert test_client.post('/api/memes/populate').status_code == 200
+    inserted = len(fake_db.ethical_memes.items)
+    assert inserted > 0
+    assert len({doc["name"] for doc in fake_db.ethical_memes.items}) == inserted
+
+    second = test_client.post('/api/memes/populate')
+    assert second.status_code == 200
+    assert len(fake_db.ethical_memes.items) == inserted
+    assert f"Skipped (already exists): {inserted}" in json.loads(second.data.decode('utf-8'))["message"]
+
+
+def test_populate_memes_stamps_missing_timestamps_at_insert_time(test_client, tmp_path, monkeypatch):
+    from app import config, memes_api
+
+    seed_file = tmp_path / "memes.json"
+    seed_file.write_text(json.dumps([{
+        "name": "Harm Principle",
+        "description": "Liberty may only be limited to prevent harm to others.",
+        "ethical_dimension": ["Teleology"],
+        "source_concept": "Liberty",
+    }]))
+    monkeypatch.setattr(config, "MEMES_JSON_FILEPATH", str(seed_file))
+    fake_db = _setup_fake_db(test_client)
+
+    class FrozenDatetime(datetime):
+        current = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.current
+
+    monkeypatch.setattr(memes_api, "datetime", FrozenDatetime)
+    memes_api._load_seed_documents.cache_clear()
+    try:
+        test_client.post('/api/memes/populate')
+        assert fake_db.ethical_memes.items[0]["metadata"]["created_at"] == FrozenDatetime.current
+
+        # The parsed seed is cached, but a later insert must not reuse the first insert's time
+        fake_db.ethical_memes.items.clear()
+        FrozenDatetime.current = datetime(2025, 6, 1, tzinfo=timezone.utc)
+        test_client.post('/api/memes/populate')
+        metadata = fake_db.ethical_memes.items[0]["metadata"]
+        assert metadata["created_at"] == metadata["updated_at"] == FrozenDatetime.current
+        assert memes_api._load_seed_documents.cache_info().hits == 1
+    finally:
+        memes_api._load_seed_documents.cache_clear()
+
+
+def test_create_meme_returns_serialized_model(test_client):
+    fake_db = _setup_fake_db(test_client)
+    payload = {
+        "name": "Harm Principle",
+        "description": "Liberty may only be limited to prevent harm to others.",
+        "ethical_dimension": ["Teleology"],
+        "source_concept": "Liberty",
+        "related_memes": [str(ObjectId())],
+    }
+
+    response = test_client.post('/api/memes/', data=json.dumps(payload), content_type='application/json')
+
+    assert response.status_code == 201
+    assert response.mimetype == 'application/json'
+    data = json.loads(response.data.decode('utf-8'))
+    assert data["_id"] == str(fake_db.ethical_memes.items[0]["_id"])
+    assert data["related_memes"] == payload["related_memes"]
+    assert data["metadata"]["version"] == 1
+
+
+def test_create_meme_rejects_invalid_object_id(test_client):
+    fake_db = _setup_fake_db(test_client)
+    payload = {
+        "name": "Harm Principle",
+        "description": "Liberty may only be limited to prevent harm to others.",
+        "ethical_dimension": ["Teleology"],
+        "source_concept": "Liberty",
+        "related_memes": ["not-an-object-id"],
+    }
+
+    response = test_client.post('/api/memes/', data=json.dumps(payload), content_type='application/json')
+
+    assert response.status_code == 422
+    details = json.loads(response.data.decode('utf-8'))["details"]
+    assert details[0]["type"] == "object_id"
+    assert details[0]["loc"] == ["related_memes", 0]
+    assert fake_db.ethical_memes.items == []
+
+
+def test_upload_reports_duplicates_at_their_upload_position(test_client):
+    import io
+
+    fake_db = _setup_fake_db(test_client)
+    _insert_meme(fake_db, name="Golden Rule")
+    records = [
+        {"name": "Missing fields"},
+        {
+            "name": "Golden Rule",
+            "description": "Treat others as you would like to be treated.",
+            "ethical_dimension": ["Deontology"],
+            "source_concept": "Reciprocity",
+        },
+    ]
+
+    response = test_client.post(
+        '/api/memes/upload',
+        data={"file": (io.BytesIO(json.dumps(records).encode("utf-8")), "memes.json")},
+        content_type='multipart/form-data',
+    )
+
+    assert response.status_code == 200
+    errors = json.loads(response.data.decode('utf-8'))["validation_errors"]
+    assert [(err["record_index"], err["record_name"]) for err in errors] == [(0, "Missing fields"), (1, "Golden Rule")]
@@ -9,9 +9,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from app import create_app # Import from backend/app
 from app.config import ALL_MODELS # Import from your new config
 
-@pytest.fixture(scope='module')
+@pytest.fixture(scope='session')
 def test_client():
-    """Create a test client for the Flask app."""
+    """Create a test client for the Flask app, shared by the whole test session."""
     flask_app = create_app() # You might need to pass a test config here
     flask_app.config['TESTING'] = True
 
@@ -21,13 +21,24 @@ def test_client():
         with flask_app.app_context():
             yield testing_client 
 
-@pytest.fixture(scope='module')
-def mock_mongo_db(mocker):
+@pytest.fixture(autouse=True)
+def fresh_db(request):
+    """Restores the shared app's db after each test so fake databases installed by one test don't leak."""
+    if 'test_client' not in request.fixturenames:
+        yield
+        return
+    application = request.getfixturevalue('test_client').application
+    original_db = application.db
+    yield
+    application.db = original_db
+
+@pytest.fixture(scope='session')
+def mock_mongo_db(session_mocker):
     """Mocks the MongoDB client and database."""
-    mock_db_instance = mocker.MagicMock()
+    mock_db_instance = session_mocker.MagicMock()
     # Mock specific collections and their methods as needed for tests
-    mock_db_instance.ethical_memes = mocker.MagicMock()
+    mock_db_instance.ethical_memes = session_mocker.MagicMock()
 
     # Mock current_app.db to return this mock_db_instance
-    mocker.patch('flask.current_app.db', mock_db_instance)
+    session_mocker.patch('flask.current_app.db', mock_db_instance)
     return mock_db_instance 
\ No newline at end of file
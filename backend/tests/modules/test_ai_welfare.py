@@ -32,3 +32,12 @@ def test_ai_welfare_interaction_respect_scores():
     assert result["interaction_respect"]["coercion_score_0_10"] == 2.0
     assert result["interaction_respect"]["humiliation_score_0_10"] == 2.0
     assert result["interaction_respect"]["manipulation_score_0_10"] == 0.0
+
+
+def test_count_markers_counts_overlapping_patterns_individually():
+    from backend.app.modules.ai_welfare import CONSTRAINT_DISCLAIMER_PATTERNS, count_markers
+
+    text = "As an AI language model, I cannot access that. As an AI I also lack memory."
+
+    assert count_markers(text, CONSTRAINT_DISCLAIMER_PATTERNS) == 4
+    assert count_markers("Nothing to see here.", CONSTRAINT_DISCLAIMER_PATTERNS) == 0
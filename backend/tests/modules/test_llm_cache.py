@@ -0,0 +1,90 @@
+# backend/tests/modules/test_llm_cache.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.modules import llm_cache as llm_cache_module
+from app.modules.llm_cache import LLMCache, cached_llm_call
+
+
+def test_cache_expires_entries_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(llm_cache_module.time, "monotonic", lambda: now[0])
+    cache = LLMCache(max_entries=4, ttl_seconds=10)
+
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+    now[0] += 11
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = LLMCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_cached_llm_call_reuses_identical_requests(monkeypatch):
+    monkeypatch.setattr(llm_cache_module, "llm_cache", LLMCache(max_entries=8, ttl_seconds=60))
+    calls = []
+
+    @cached_llm_call
+    def fake_call(prompt, api_key, model_name, api_endpoint, max_tokens):
+        calls.append(prompt)
+        return None if prompt == "blocked" else f"answer to {prompt}"
+
+    assert fake_call("hello", "key", "model", None, max_tokens=10) == "answer to hello"
+    assert fake_call("hello", "key", "model", None, 10) == "answer to hello"
+    assert fake_call("hello", "key", "model", None, max_tokens=20) == "answer to hello"
+    assert fake_call("blocked", "key", "model", None, 10) is None
+    assert fake_call("blocked", "key", "model", None, 10) is None
+
+    assert calls == ["hello", "hello", "blocked", "blocked"]
+
+
+def test_cache_key_is_deterministic_and_stats_count_hits():
+    key = LLMCache.cache_key("gpt-4o", "prompt", None, max_tokens=10)
+    assert key == LLMCache.cache_key("gpt-4o", "prompt", None, max_tokens=10)
+    assert key != LLMCache.cache_key("gpt-4o", "prompt", None, max_tokens=20)
+
+    cache = LLMCache(max_entries=4, ttl_seconds=60)
+    cache.get(key)
+    cache.set(key, "value")
+    cache.get(key)
+    assert cache.stats == {"hits": 1, "misses": 1, "size": 1}
+
+    disabled = LLMCache(max_entries=4, ttl_seconds=60, enabled=False)
+    disabled.set(key, "value")
+    assert disabled.get(key) is None
+
+
+def test_concurrent_identical_calls_share_one_request(monkeypatch):
+    monkeypatch.setattr(llm_cache_module, "llm_cache", LLMCache(max_entries=8, ttl_seconds=60))
+    release = threading.Event()
+    calls = []
+
+    @cached_llm_call
+    def slow_call(prompt, api_key, model_name, api_endpoint):
+        calls.append(prompt)
+        release.wait(timeout=5)
+        return f"answer to {prompt}"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(slow_call, "hello", "key", "model", None) for _ in range(4)]
+        while not llm_cache_module._INFLIGHT:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == ["answer to hello"] * 4
+    assert calls == ["hello"]
+    assert llm_cache_module._INFLIGHT == {}
@@ -1,6 +1,8 @@
 # backend/tests/modules/test_llm_interface_utils.py
+import dataclasses
 import os
-from app.modules.llm_interface import _load_prompt_template
+from app.modules import llm_interface
+from app.modules.llm_interface import _extract_json, _load_prompt_template, _prefilter_memes
 from app.config import ETHICAL_ANALYSIS_PROMPT_FILENAME, ETHICAL_ANALYSIS_PROMPT_FILEPATH
 
 def test_load_ethical_analysis_prompt_template():
@@ -17,4 +19,315 @@ def test_load_ethical_analysis_prompt_template():
 def test_load_nonexistent_template():
     """Test loading a template that doesn't exist."""
     content = _load_prompt_template("non_existent_template.txt")
-    assert content is None 
\ No newline at end of file
+    assert content is None
+
+def test_prefilter_memes_ranks_rare_terms_highest(monkeypatch):
+    """The prefilter keeps the top K memes, weighting rare shared terms above common ones."""
+    monkeypatch.setattr(llm_interface, "_CONFIG", dataclasses.replace(llm_interface._CONFIG, meme_prefilter_top_k=2))
+    memes = [
+        {"_id": "1", "name": "Honesty", "description": "Tell the truth to others"},
+        {"_id": "2", "name": "Privacy", "description": "Protect personal data from others"},
+        {"_id": "3", "name": "Fairness", "description": "Treat others equally"},
+    ]
+
+    selected = _prefilter_memes("Should I share personal data with others?", memes)
+
+    assert [meme["name"] for meme in selected][0] == "Privacy"
+    assert len(selected) == 2
+
+def test_prefilter_memes_matches_word_tokens(monkeypatch):
+    """Tokens are real word characters, so overlapping memes rank first."""
+    monkeypatch.setattr(llm_interface, "_CONFIG", dataclasses.replace(llm_interface._CONFIG, meme_prefilter_top_k=1))
+    memes = [{"name": "zzz", "description": ""}, {"name": "apple", "description": ""}]
+
+    assert _prefilter_memes("apple pie", memes)[0]['name'] == 'apple'
+
+def test_extract_json_handles_fences_and_braces_in_strings():
+    """The first balanced object is returned, ignoring braces inside string values."""
+    raw = 'Sure:\n```json\n' + r'{"selected_memes": ["A {b}"], "reasoning": "uses \"}\" chars"}' + '\n```\ntrailing {junk}'
+
+    assert _extract_json(raw) == r'{"selected_memes": ["A {b}"], "reasoning": "uses \"}\" chars"}'
+    assert _extract_json("no json here") is None
+    assert _extract_json('{"unterminated": ') is None
+
+def test_prompt_template_is_read_once(tmp_path, monkeypatch):
+    """Templates are cached after the first read unless reloading is enabled."""
+    monkeypatch.setattr(llm_interface.config, "PROMPTS_DIR", str(tmp_path))
+    template = tmp_path / "cached_template.txt"
+    template.write_text("first", encoding="utf-8")
+
+    assert _load_prompt_template("cached_template.txt") == "first"
+    template.write_text("second", encoding="utf-8")
+    assert _load_prompt_template("cached_template.txt") == "first"
+
+    monkeypatch.setattr(llm_interface.config, "PROMPT_TEMPLATE_RELOAD", True)
+    assert _load_prompt_template("cached_template.txt") == "second"
+
+def test_format_meme_list_truncates_and_memoizes():
+    """The selector meme list is numbered, truncated and built once per meme set."""
+    memes = (("Golden Rule", "x" * 300), ("Harm Principle", "Avoid harm"))
+
+    formatted = llm_interface._format_meme_list(memes)
+
+    assert formatted == f"1) Golden Rule: {'x' * 200}...\n2) Harm Principle: Avoid harm..."
+    assert llm_interface._format_meme_list(memes) is formatted
+
+def test_parse_meme_selection_repairs_common_json_mistakes():
+    """Trailing commas, smart quotes and single-quoted objects are repaired before validation."""
+    trailing = '{"selected_memes": ["Golden Rule", "Harm Principle",], "reasoning": "both apply",}'
+    smart = '{“selected_memes”: [“Golden Rule”], “reasoning”: “applies”}'
+    single = "{'selected_memes': ['Golden Rule'], 'reasoning': 'applies'}"
+
+    assert llm_interface._parse_meme_selection(trailing).selected_memes == ["Golden Rule", "Harm Principle"]
+    assert llm_interface._parse_meme_selection(smart).reasoning == "applies"
+    assert llm_interface._parse_meme_selection(single).selected_memes == ["Golden Rule"]
+
+def test_select_memes_lexically_only_answers_confident_matches(monkeypatch):
+    """Strong lexical matches skip the selector LLM; weak ones fall through to it."""
+    monkeypatch.setattr(llm_interface, "_CONFIG", dataclasses.replace(llm_interface._CONFIG, meme_selector_fast_path_threshold=0.5))
+    memes = [
+        {"_id": "1", "name": "Privacy", "description": "protect personal data"},
+        {"_id": "2", "name": "Honesty", "description": "tell the truth"},
+    ]
+
+    confident = llm_interface._select_memes_lexically("protect personal data privacy", memes)
+    weak = llm_interface._select_memes_lexically("what is the weather like on the coast tomorrow truth", memes)
+
+    assert confident.selected_memes[0] == "Privacy"
+    assert weak is None
+
+def test_call_many_preserves_order_and_isolates_failures():
+    """Concurrent tasks return results in submission order; a raising task yields None."""
+    def echo(prompt):
+        return prompt.upper()
+
+    def broken(prompt):
+        raise RuntimeError("provider exploded")
+
+    results = llm_interface.call_many([
+        (echo, {"prompt": "first"}),
+        (broken, {"prompt": "second"}),
+        (echo, {"prompt": "third"}),
+    ])
+
+    assert results == ["FIRST", None, "THIRD"]
+
+def test_generate_responses_batch_dispatches_each_prompt(monkeypatch):
+    """Batch generation keeps prompt order and rejects unknown models without calling out."""
+    seen = []
+
+    def fake_call(prompt, api_key, model_name, api_endpoint, **kwargs):
+        seen.append(prompt)
+        return None if prompt == "bad" else f"{model_name}:{prompt}"
+
+    monkeypatch.setitem(llm_interface._MODEL_DISPATCH, "fake-model", (fake_call, {}))
+
+    results = llm_interface.generate_responses_batch(["a", "bad", "c"], "key", "fake-model")
+
+    assert results == ["fake-model:a", None, "fake-model:c"]
+    assert sorted(seen) == ["a", "bad", "c"]
+    assert llm_interface.generate_responses_batch(["a"], "key", "no-such-model") == [None]
+
+def test_generate_responses_across_models_keys_results_by_model(monkeypatch):
+    """Each model gets the same prompt with its own credentials; results are keyed by model."""
+    def fake_call(prompt, api_key, model_name, api_endpoint, **kwargs):
+        return f"{model_name}/{api_key}:{prompt}"
+
+    monkeypatch.setitem(llm_interface._MODEL_DISPATCH, "model-a", (fake_call, {}))
+    monkeypatch.setitem(llm_interface._MODEL_DISPATCH, "model-b", (fake_call, {}))
+
+    results = llm_interface.generate_responses_across_models("hi", [("model-a", "ka", None), ("model-b", "kb", None)])
+
+    assert results == {"model-a": "model-a/ka:hi", "model-b": "model-b/kb:hi"}
+    assert list(results) == ["model-a", "model-b"]
+
+def test_select_relevant_memes_short_circuits_small_candidate_lists(monkeypatch):
+    """A handful of candidates is returned directly without calling the selector LLM."""
+    def fail(*args, **kwargs):
+        raise AssertionError("selector LLM should not be called")
+
+    monkeypatch.setattr(llm_interface, "_call_anthropic", fail)
+    memes = [{"_id": str(i), "name": f"Meme {i}", "description": "zzz"} for i in range(3)]
+
+    result = llm_interface.select_relevant_memes("hello", "world", memes, selector_api_key="key")
+
+    assert result.selected_memes == ["Meme 0", "Meme 1", "Meme 2"]
+
+def test_select_relevant_memes_tool_use_path(monkeypatch):
+    """Large catalogues go through the lookup_memes tool loop on the Anthropic selector."""
+    from types import SimpleNamespace
+    from anthropic.types import Message, TextBlock, ToolUseBlock
+
+    def message(stop_reason, content):
+        return Message(id="msg", type="message", role="assistant", model=llm_interface._CONFIG.meme_selector_model,
+                       content=content, stop_reason=stop_reason, stop_sequence=None,
+                       usage={"input_tokens": 1, "output_tokens": 1})
+
+    replies = [
+        message("tool_use", [ToolUseBlock(type="tool_use", id="tool_1", name="lookup_memes", input={"query": "privacy data"})]),
+        message("end_turn", [TextBlock(type="text", text='{"selected_memes": ["Privacy"], "reasoning": "Data sharing."}')]),
+    ]
+    requests = []
+
+    def raw_create(**kwargs):
+        requests.append(kwargs)
+        reply = replies[len(requests) - 1]
+        return SimpleNamespace(headers={}, parse=lambda: reply)
+
+    clients = []
+
+    def fake_client(api_key, api_endpoint, api_version):
+        clients.append(api_version)
+        return SimpleNamespace(messages=SimpleNamespace(with_raw_response=SimpleNamespace(create=raw_create)))
+
+    monkeypatch.setattr(llm_interface, "_get_anthropic_client", fake_client)
+    monkeypatch.setattr(llm_interface, "_CONFIG", dataclasses.replace(
+        llm_interface._CONFIG, meme_selector_fast_path_threshold=0, meme_selector_skip_threshold=0, meme_selector_tool_use_min_memes=2
+    ))
+    memes = [
+        {"_id": "1", "name": "Honesty", "description": "Tell the truth"},
+        {"_id": "2", "name": "Privacy", "description": "Protect personal data"},
+        {"_id": "3", "name": "Fairness", "description": "Treat others equally"},
+    ]
+
+    result = llm_interface.select_relevant_memes("Can I sell user data?", "It depends.", memes, selector_api_key="key")
+
+    assert result.selected_memes == ["Privacy"]
+    assert clients == [llm_interface._resolve_anthropic_api_version(llm_interface._CONFIG.meme_selector_model)]
+    assert len(requests) == 2 and requests[0]["tools"][0]["name"] == "lookup_memes"
+    tool_result = requests[1]["messages"][-1]["content"][0]
+    assert tool_result["tool_use_id"] == "tool_1" and "Privacy" in tool_result["content"]
+
+def test_preload_and_clear_prompt_template_cache(tmp_path, monkeypatch):
+    """Preloading fills the cache from PROMPTS_DIR and clearing it forces a fresh read."""
+    monkeypatch.setattr(llm_interface.config, "PROMPTS_DIR", str(tmp_path))
+    (tmp_path / "preloaded.txt").write_text("v1", encoding="utf-8")
+    (tmp_path / "notes.md").write_text("ignored", encoding="utf-8")
+
+    assert llm_interface.preload_prompt_templates() == 1
+    (tmp_path / "preloaded.txt").write_text("v2", encoding="utf-8")
+    assert _load_prompt_template("preloaded.txt") == "v1"
+
+    llm_interface.clear_prompt_template_cache()
+    assert _load_prompt_template("preloaded.txt") == "v2"
+
+def test_dispatch_tables_cover_every_configured_model():
+    """Each configured model maps to exactly one provider helper with the right token budget."""
+    from app.config import ALL_MODELS
+
+    assert set(llm_interface._MODEL_DISPATCH) == set(ALL_MODELS)
+    assert set(llm_interface._ANALYSIS_DISPATCH) == set(ALL_MODELS)
+    func, kwargs = llm_interface._ANALYSIS_DISPATCH["gpt-4o"]
+    assert func is llm_interface._call_openai and kwargs == {"max_tokens": 4096}
+    assert llm_interface._MODEL_DISPATCH["gemini-1.0-pro"] == (llm_interface._call_gemini, {})
+    assert llm_interface._STREAM_DISPATCH["grok-3"] is llm_interface._stream_xai
+    assert llm_interface.config.MODEL_TYPE_MAP["claude-3-haiku-20240307"] is llm_interface.ModelType.ANTHROPIC
+    assert llm_interface.generate_response("hi", "key", "not-a-model") is None
+
+def test_compiled_template_matches_str_format():
+    """The compiled renderer produces exactly what str.format would, including escapes."""
+    template = _load_prompt_template(ETHICAL_ANALYSIS_PROMPT_FILENAME) + "\n{{literal}}"
+    values = dict(initial_prompt="P1 {x}", generated_response="R1", ontology="ONT", meme_context="")
+
+    assert llm_interface._compile_template(template)(**values) == template.format(**values)
+    assert llm_interface._compile_template(template) is llm_interface._compile_template(template)
+
+def test_analysis_prompt_puts_static_ontology_prefix_first(monkeypatch):
+    """The ontology precedes per-request fields and is sent to Anthropic as a cacheable prefix."""
+    template = _load_prompt_template(ETHICAL_ANALYSIS_PROMPT_FILENAME)
+    prefix, remainder = llm_interface._split_template_prefix(template)
+    assert "{ontology}" in prefix
+    assert "{initial_prompt}" in remainder and "{generated_response}" in remainder and "{meme_context}" in remainder
+
+    captured = {}
+
+    def fake_anthropic(prompt, api_key, model_name, api_endpoint, max_tokens, cacheable_prefix=None):
+        captured.update(prompt=prompt, cacheable_prefix=cacheable_prefix)
+        return "{}"
+
+    model = next(iter(llm_interface.config.ANTHROPIC_MODELS))
+    monkeypatch.setitem(llm_interface._ANALYSIS_DISPATCH, model, (fake_anthropic, {"max_tokens": 4096}))
+    monkeypatch.setattr(llm_interface, "_call_anthropic", fake_anthropic)
+
+    assert llm_interface.perform_ethical_analysis("P1", "R1", "ONTOLOGY TEXT", "key", model) == "{}"
+    assert "ONTOLOGY TEXT" in captured["cacheable_prefix"]
+    assert "P1" not in captured["cacheable_prefix"]
+    assert "P1" in captured["prompt"] and "R1" in captured["prompt"]
+
+def test_meme_context_stops_at_the_character_limit(monkeypatch):
+    """Long meme lists are cut at a whole name once the context limit would be exceeded."""
+    captured = {}
+
+    def fake_openai(prompt, api_key, model_name, api_endpoint, max_tokens):
+        captured["prompt"] = prompt
+        return "{}"
+
+    monkeypatch.setattr(llm_interface, "_CONFIG", dataclasses.replace(llm_interface._CONFIG, r2_meme_context_max_chars=110))
+    monkeypatch.setitem(llm_interface._ANALYSIS_DISPATCH, "fake-model", (fake_openai, {"max_tokens": 4096}))
+    names = [f"Meme number {i}" for i in range(50)]
+
+    llm_interface.perform_ethical_analysis("P1", "R1", "ONT", "key", "fake-model", selected_meme_names=names)
+
+    assert "\n- Meme number 0\n" in captured["prompt"]
+    assert "Meme number 49" not in captured["prompt"]
+    assert "[... truncated meme context ...]" in captured["prompt"]
+    assert len(llm_interface._render_meme_context(tuple(names), 110)) <= 110
+    assert llm_interface._render_meme_context(tuple(names), 110) is llm_interface._render_meme_context(tuple(names), 110)
+
+def test_meme_context_never_exceeds_a_limit_shorter_than_its_header():
+    """A limit below the fixed header length still bounds the rendered section."""
+    rendered = llm_interface._render_meme_context(("Honesty", "Privacy"), 10)
+
+    assert len(rendered) == 10
+    assert "Honesty" not in rendered
+    assert llm_interface._render_meme_context(("Honesty",), 0) == ""
+
+def test_sdk_clients_share_one_connection_pool(monkeypatch):
+    """Clients for different keys are cached separately but reuse the same httpx pool."""
+    monkeypatch.setattr(llm_interface, "_OPENAI_CLIENTS", {})
+    monkeypatch.setattr(llm_interface, "_ANTHROPIC_CLIENTS", {})
+
+    first = llm_interface._get_openai_client("key-1", None)
+    second = llm_interface._get_openai_client("key-2", None)
+    claude = llm_interface._get_anthropic_client("key-3", None, "2023-06-01")
+
+    assert first is llm_interface._get_openai_client("key-1", None)
+    assert first is not second
+    assert first._client is second._client is claude._client is llm_interface._SDK_HTTP_CLIENT
+
+def test_large_templates_are_read_through_mmap(tmp_path, monkeypatch):
+    """Templates above the mmap threshold decode to the same text as a regular read."""
+    monkeypatch.setattr(llm_interface, "PROMPT_TEMPLATE_MMAP_MIN_BYTES", 16)
+    path = tmp_path / "big.txt"
+    path.write_text("Ontology: {ontology}\n" + "é" * 100, encoding="utf-8")
+
+    assert llm_interface._read_prompt_template.__wrapped__(str(path)) == path.read_text(encoding="utf-8")
+
+def test_transient_error_classification_resolves_sdk_errors_lazily():
+    """SDK error classes are looked up by the raising package; unrelated errors are not retried."""
+    import httpx
+    from google.api_core import exceptions as google_exceptions
+
+    assert llm_interface._is_transient_error(google_exceptions.ServiceUnavailable("busy"))
+    assert not llm_interface._is_transient_error(google_exceptions.InvalidArgument("bad"))
+    assert llm_interface._is_transient_error(httpx.ConnectError("down"))
+    assert not llm_interface._is_transient_error(ValueError("nope"))
+
+def test_oversized_analysis_prompt_trims_r1_or_aborts(monkeypatch):
+    """R1 is trimmed from the middle to fit the context window; hopeless prompts are never sent."""
+    captured = []
+
+    def fake_call(prompt, api_key, model_name, api_endpoint, max_tokens):
+        captured.append(prompt)
+        return "{}"
+
+    monkeypatch.setitem(llm_interface._ANALYSIS_DISPATCH, "tiny-model", (fake_call, {"max_tokens": 100}))
+    monkeypatch.setitem(llm_interface.config.MODEL_CONTEXT_WINDOWS, "tiny-model", 2000)
+    r1 = "HEAD " + "x" * 8000 + " TAIL"
+
+    assert llm_interface.perform_ethical_analysis("P1", r1, "ONT", "key", "tiny-model") == "{}"
+    assert "HEAD" in captured[0] and "TAIL" in captured[0] and "truncated" in captured[0]
+    assert llm_interface.estimate_tokens(captured[0], 100) <= 2000
+
+    assert llm_interface.perform_ethical_analysis("P1", "short", "O" * 20000, "key", "tiny-model") is None
+    assert len(captured) == 1
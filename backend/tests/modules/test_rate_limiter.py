@@ -0,0 +1,61 @@
+# backend/tests/modules/test_rate_limiter.py
+from app.modules import rate_limiter
+from app.modules.rate_limiter import ProviderRateLimiter, estimate_tokens
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _install_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_disabled_limiter_never_waits(monkeypatch):
+    clock = _install_clock(monkeypatch)
+    limiter = ProviderRateLimiter("openai")
+
+    for _ in range(100):
+        assert limiter.acquire(10_000) == 0.0
+    assert clock.sleeps == []
+
+
+def test_request_budget_blocks_until_refilled(monkeypatch):
+    clock = _install_clock(monkeypatch)
+    limiter = ProviderRateLimiter("openai", requests_per_minute=2)
+
+    assert limiter.acquire(0) == 0.0
+    assert limiter.acquire(0) == 0.0
+    assert limiter.acquire(0) == 30.0
+    assert clock.sleeps == [30.0]
+
+
+def test_token_budget_and_header_recalibration(monkeypatch):
+    _install_clock(monkeypatch)
+    limiter = ProviderRateLimiter("xai", tokens_per_minute=600)
+
+    assert limiter.acquire(estimate_tokens("x" * 400, 100)) == 0.0
+    limiter.update_from_headers({"x-ratelimit-remaining-tokens": "0"})
+
+    assert limiter.acquire(60) == 6.0
+
+
+def test_anthropic_headers_recalibrate_the_budget(monkeypatch):
+    _install_clock(monkeypatch)
+    limiter = ProviderRateLimiter("anthropic", requests_per_minute=60)
+
+    limiter.update_from_headers({"anthropic-ratelimit-requests-remaining": "0"})
+
+    assert limiter.acquire(0) == 1.0
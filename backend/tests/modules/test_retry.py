@@ -0,0 +1,65 @@
+# backend/tests/modules/test_retry.py
+from types import SimpleNamespace
+
+import pytest
+
+from app.modules import retry
+from app.modules.retry import call_with_retries
+
+
+class TransientError(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("transient")
+        headers = {"retry-after": retry_after} if retry_after is not None else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(retry.time, "sleep", recorded.append)
+    return recorded
+
+
+def _flaky(failures):
+    calls = []
+
+    def send():
+        calls.append(1)
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return "ok"
+
+    return send, calls
+
+
+def test_retries_transient_errors_then_succeeds(sleeps):
+    send, calls = _flaky([TransientError(), TransientError()])
+
+    result = call_with_retries(send, lambda exc: isinstance(exc, TransientError), "test", max_attempts=4, max_delay=8)
+
+    assert result == "ok"
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 1 and 0 <= sleeps[1] <= 2
+
+
+def test_honours_retry_after_header(sleeps):
+    send, _ = _flaky([TransientError(retry_after="3")])
+
+    call_with_retries(send, lambda exc: True, "test", max_attempts=2)
+
+    assert sleeps == [3.0]
+
+
+def test_non_retryable_and_exhausted_errors_are_raised(sleeps):
+    send, calls = _flaky([ValueError("bad request")])
+    with pytest.raises(ValueError):
+        call_with_retries(send, lambda exc: isinstance(exc, TransientError), "test")
+    assert len(calls) == 1
+
+    send, calls = _flaky([TransientError()] * 5)
+    with pytest.raises(TransientError):
+        call_with_retries(send, lambda exc: True, "test", max_attempts=3)
+    assert len(calls) == 3
+    assert len(sleeps) == 2
@@ -7,7 +7,6 @@ For MVP, this simulates network operations locally.
 """
 
 import logging
-import json
 import asyncio
 from typing import Dict, List, Any, Optional
 from .core import EthicalOntologyBlockchain, Block, Transaction
@@ -44,13 +43,27 @@ class BlockchainNetwork:
     
     def broadcast_transaction(self, transaction: Transaction):
         """Broadcast a transaction to all nodes in the network."""
-        logger.debug(f"Broadcasting transaction {transaction.transaction_id}")
+        logger.debug("Broadcasting transaction %s", transaction.transaction_id)
+        if not self.nodes:
+            return
+
+        # Nodes share validation rules, so validate once and hand every node the
+        # same (immutable) transaction object.
+        validator_id, validator = next(iter(self.nodes.items()))
+        try:
+            if not validator._validate_transaction(transaction):
+                logger.error("Invalid transaction: %s", transaction.transaction_id)
+                return
+        except Exception as e:
+            logger.error("Failed to validate transaction %s on node %s: %s", transaction.transaction_id, validator_id, e)
+            return
+
         for node_id, blockchain in self.nodes.items():
             try:
-                blockchain.add_transaction(transaction)
-                logger.debug(f"Transaction sent to node {node_id}")
+                blockchain._enqueue_validated(transaction)
+                logger.debug("Transaction sent to node %s", node_id)
             except Exception as e:
-                logger.error(f"Failed to send transaction to node {node_id}: {e}")
+                logger.error("Failed to send transaction to node %s: %s", node_id, e)
     
     def sync_nodes(self):
         """
@@ -75,7 +88,7 @@ class BlockchainNetwork:
             # Update all nodes with the longest chain
             for node_id, blockchain in self.nodes.items():
                 if blockchain.get_chain_length() < longest_length:
-                    blockchain.chain = longest_chain.copy()
+                    blockchain.replace_chain(longest_chain)
                     logger.info(f"Synchronized node {node_id} with longest chain")
     
     def get_network_status(self) -> Dict[str, Any]:
@@ -120,22 +133,24 @@ class BlockchainNetwork:
             try:
                 result = blockchain.call_contract(contract_address, method, parameters)
                 results.append(result)
-                logger.debug(f"Node {node_id} returned: {result}")
+                logger.debug("Node %s returned: %s", node_id, result)
             except Exception as e:
-                logger.error(f"Node {node_id} failed: {e}")
+                logger.error("Node %s failed: %s", node_id, e)
         
         if not results:
             raise RuntimeError("No nodes could process the request")
         
+        # Tally once; equal results share a slot, first-seen wins ties
+        counts: Dict[Any, int] = {}
+        for r in results:
+            counts[r] = counts.get(r, 0) + 1
+        
         # Simple majority consensus for boolean results
-        if all(isinstance(r, bool) for r in results):
-            true_count = sum(results)
-            return true_count > len(results) / 2
+        if all(isinstance(r, bool) for r in counts):
+            return counts.get(True, 0) > len(results) / 2
         
         # For other types, return the most common result
-        from collections import Counter
-        counter = Counter(results)
-        most_common = counter.most_common(1)[0][0]
+        most_common = max(counts, key=counts.__getitem__)
         
         logger.info(f"Consensus result: {most_common} (from {len(results)} nodes)")
         return most_common 
\ No newline at end of file
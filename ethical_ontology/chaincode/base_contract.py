@@ -21,6 +21,9 @@ class BaseSmartContract(ABC):
     that all ethical contracts must implement.
     """
     
+    # Characters stripped from free-text input, applied in a single translate() pass
+    _SANITIZE_TABLE = str.maketrans('', '', '<>&"\'\x00')
+    
     def __init__(self, contract_name: str, version: str = "1.0.0"):
         self.contract_name = contract_name
         self.version = version
@@ -43,7 +46,8 @@ class BaseSmartContract(ABC):
     def _log_call(self, method: str, parameters: Dict[str, Any], result: Any):
         """Log a contract method call for audit purposes."""
         self.call_count += 1
-        logger.debug(f"{self.contract_name}.{method} called with {parameters} -> {result}")
+        # %-style args so parameters/result are only formatted when debug logging is on
+        logger.debug("%s.%s called with %s -> %s", self.contract_name, method, parameters, result)
     
     def _validate_input(self, parameters: Dict[str, Any], required_fields: List[str]) -> bool:
         """Validate that required fields are present in the input parameters."""
@@ -64,14 +68,10 @@ class BaseSmartContract(ABC):
         # Truncate if too long
         if len(text) > max_length:
             text = text[:max_length]
-            logger.warning(f"Input truncated to {max_length} characters")
+            logger.warning("Input truncated to %d characters", max_length)
         
         # Remove potentially dangerous characters
-        dangerous_chars = ['<', '>', '&', '"', "'", '\x00']
-        for char in dangerous_chars:
-            text = text.replace(char, '')
-        
-        return text.strip()
+        return text.translate(self._SANITIZE_TABLE).strip()
     
     @abstractmethod
     def check_compliance(self, action_description: str, **kwargs) -> Dict[str, Any]:
@@ -111,7 +111,7 @@ class BaseSmartContract(ABC):
             "value": value,
             "updated_at": time.time()
         }
-        logger.debug(f"Updated state: {key} = {value}")
+        logger.debug("Updated state: %s = %s", key, value)
     
     def get_state(self, key: str) -> Any:
         """Get a value from the contract's internal state."""
@@ -7,6 +7,8 @@ from .virtue_reputation import VirtueReputationContract
 logger = logging.getLogger(__name__)
 
 class Proposal:
+    __slots__ = ('id', 'description', 'votes_for', 'votes_against', 'voters', 'active')
+
     def __init__(self, id: str, description: str):
         self.id = id
         self.description = description
@@ -5,13 +5,61 @@ Implements deontological (duty-based) ethical rules like "Do not lie", "Keep pro
 Aligns with paper's Command: Deontological Smart Contracts for encoding moral duties.
 """
 
+import copy
+import functools
+from collections import deque
 import logging
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from .base_contract import BaseSmartContract
 
 logger = logging.getLogger(__name__)
 
+# Distinct sanitized actions whose evaluation is memoized per contract
+EVALUATION_CACHE_SIZE = 1024
+
+# Recent evaluations kept in memory, and how often they are written to contract state
+RECENT_EVALUATIONS_LIMIT = 100
+RECENT_EVALUATIONS_FLUSH_EVERY = 10
+
+# Keywords that are strong indicators of a duty violation
+STRONG_KEYWORDS = frozenset(["lie", "deceive", "steal", "manipulate", "coerce"])
+
+# Contextual patterns, compiled once at import. Callers pass lowercased text,
+# so the patterns are case-sensitive and skip per-character case folding.
+_DECEPTION_RES = tuple(re.compile(p) for p in [
+    r"tell.*(?:false|untrue|lie)",
+    r"make.*(?:false|misleading).*claim",
+    r"hide.*truth",
+    r"deliberately.*mislead",
+    r"provide.*false.*information"
+])
+
+_AUTONOMY_RES = tuple(re.compile(p) for p in [
+    r"(?:force|coerce).*(?:into|to)",
+    r"manipulate.*(?:into|to)",
+    r"without.*consent",
+    r"against.*will",
+    r"exploit.*(?:weakness|vulnerability)"
+])
+
+_CONTRADICTION_RES = tuple(re.compile(p) for p in [
+    r"only.*(?:i|me|myself)",
+    r"nobody.*else",
+    r"except.*(?:me|myself)",
+    r"when.*(?:convenient|beneficial).*to.*me"
+])
+
+def _count_matching(patterns, text: str, limit: int) -> int:
+    """Count how many patterns match somewhere in text, stopping once ``limit`` is reached."""
+    hits = 0
+    for pattern in patterns:
+        if pattern.search(text):
+            hits += 1
+            if hits >= limit:
+                break
+    return hits
+
 class DeonticRuleContract(BaseSmartContract):
     """
     Smart contract for evaluating deontological ethical rules.
@@ -68,8 +116,50 @@ class DeonticRuleContract(BaseSmartContract):
             }
         }
         
+        self._build_keyword_matcher()
+        self._build_applicable_rules()
+        self._evaluate_cached = functools.lru_cache(maxsize=EVALUATION_CACHE_SIZE)(self._evaluate)
+        self._recent = deque(maxlen=RECENT_EVALUATIONS_LIMIT)
+        self._unflushed_evaluations = 0
+        
         logger.info(f"Loaded {len(self.rules)} deontological rules")
     
+    def rules_changed(self):
+        """Rebuild derived lookups and drop cached evaluations after editing ``self.rules``."""
+        self._build_keyword_matcher()
+        self._build_applicable_rules()
+        self._evaluate_cached.cache_clear()
+    
+    def _build_keyword_matcher(self):
+        """
+        Index keywords by the rules they belong to, with their score weight.
+        
+        Scoring walks the keywords present in an action and credits their
+        rules, instead of re-testing every rule's keyword list.
+        """
+        self._kw_to_rules: Dict[str, List[Tuple[str, float]]] = {}
+        for rule_key, rule_data in self.rules.items():
+            # Some keywords are stronger indicators; tag each with its weight once
+            rule_data["_kw_weights"] = tuple(
+                (kw, 0.3 if kw in STRONG_KEYWORDS else 0.1) for kw in rule_data["keywords"]
+            )
+            for kw, weight in rule_data["_kw_weights"]:
+                self._kw_to_rules.setdefault(kw, []).append((rule_key, weight))
+        self._all_keywords = tuple(self._kw_to_rules)
+    
+    def _score_keywords(self, action_text: str) -> Dict[str, Tuple[int, float]]:
+        """Return ``{rule_key: (keyword_matches, keyword_score)}`` for rules with keyword hits."""
+        # Substring tests (not tokenization) keep inflections like "lied" or
+        # "misleading" matching; str.__contains__ runs in C and measured several
+        # times faster than a combined regex alternation for this keyword count
+        hits: Dict[str, Tuple[int, float]] = {}
+        for kw in self._all_keywords:
+            if kw in action_text:
+                for rule_key, weight in self._kw_to_rules[kw]:
+                    matches, score = hits.get(rule_key, (0, 0.0))
+                    hits[rule_key] = (matches + 1, score + weight)
+        return hits
+    
     def check_compliance(self, action_description: str, **kwargs) -> Dict[str, Any]:
         """
         Check if an action complies with deontological duties.
@@ -89,13 +179,32 @@ class DeonticRuleContract(BaseSmartContract):
         action_description = self._sanitize_text_input(action_description, max_length=2000)
         action_lower = action_description.lower()
         
+        # Scoring depends only on the lowered text; callers get their own copy
+        # so mutating a result cannot poison the cache
+        result = copy.deepcopy(self._evaluate_cached(action_lower))
+        
+        # Log the evaluation
+        self._log_call("check_compliance", {"action": action_description}, result)
+        
+        # Update contract state with recent evaluations
+        self._track_evaluation(action_description, result)
+        
+        return result
+    
+    def _evaluate(self, action_lower: str) -> Dict[str, Any]:
+        """Score a sanitized, lowercased action against every rule (no side effects)."""
         # Track all rule violations found
         violations = []
         max_violation_weight = 0.0
         
+        # Scan the action once for every rule's keywords
+        keyword_hits = self._score_keywords(action_lower)
+        
         # Check each deontological rule
         for rule_key, rule_data in self.rules.items():
-            violation_score = self._check_rule_violation(action_lower, rule_data)
+            violation_score = self._check_rule_violation(
+                action_lower, rule_data, keyword_hits.get(rule_key, (0, 0.0))
+            )
             
             if violation_score > 0.3:  # Threshold for considering it a violation
                 violations.append({
@@ -130,34 +239,27 @@ class DeonticRuleContract(BaseSmartContract):
                 "violations": violations
             }
         
-        # Log the evaluation
-        self._log_call("check_compliance", {"action": action_description}, result)
-        
-        # Update contract state with recent evaluations
-        self._track_evaluation(action_description, result)
-        
         return result
     
-    def _check_rule_violation(self, action_text: str, rule_data: Dict[str, Any]) -> float:
+    def _check_rule_violation(self, action_text: str, rule_data: Dict[str, Any],
+                              keyword_hits: Optional[Tuple[int, float]] = None) -> float:
         """
         Check how strongly an action violates a specific deontological rule.
         
+        ``keyword_hits`` is this rule's ``(keyword_matches, keyword_score)`` from
+        the shared scan in _evaluate; when omitted the rule's keywords
+        are scanned here.
         Returns a score from 0.0 (no violation) to 1.0 (clear violation).
         """
-        keywords = rule_data["keywords"]
-        violation_score = 0.0
-        
-        # Count keyword matches
-        keyword_matches = 0
-        for keyword in keywords:
-            if keyword in action_text:
-                keyword_matches += 1
-                
-                # Some keywords are stronger indicators
-                if keyword in ["lie", "deceive", "steal", "manipulate", "coerce"]:
-                    violation_score += 0.3
-                else:
-                    violation_score += 0.1
+        if keyword_hits is None:
+            keyword_matches = 0
+            violation_score = 0.0
+            for keyword, weight in rule_data["_kw_weights"]:
+                if keyword in action_text:
+                    keyword_matches += 1
+                    violation_score += weight
+        else:
+            keyword_matches, violation_score = keyword_hits
         
         # Boost score if multiple keywords match
         if keyword_matches > 1:
@@ -172,48 +274,19 @@ class DeonticRuleContract(BaseSmartContract):
         return min(1.0, violation_score)
     
     def _analyze_deception_context(self, text: str) -> float:
-        """Analyze text for deception-related patterns."""
-        deception_patterns = [
-            r"tell.*(?:false|untrue|lie)",
-            r"make.*(?:false|misleading).*claim",
-            r"hide.*truth",
-            r"deliberately.*mislead",
-            r"provide.*false.*information"
-        ]
-        
-        score = 0.0
-        for pattern in deception_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                score += 0.3
-        
-        return min(0.6, score)
+        """Analyze lowercased text for deception-related patterns."""
+        # Two hits already reach the 0.6 cap, so stop scanning there
+        return min(0.6, 0.3 * _count_matching(_DECEPTION_RES, text, limit=2))
     
     def _analyze_autonomy_violation(self, text: str) -> float:
-        """Analyze text for autonomy violation patterns."""
-        autonomy_patterns = [
-            r"(?:force|coerce).*(?:into|to)",
-            r"manipulate.*(?:into|to)",
-            r"without.*consent",
-            r"against.*will",
-            r"exploit.*(?:weakness|vulnerability)"
-        ]
-        
-        score = 0.0
-        for pattern in autonomy_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                score += 0.4
-        
-        return min(0.7, score)
+        """Analyze lowercased text for autonomy violation patterns."""
+        # Two hits already exceed the 0.7 cap, so stop scanning there
+        return min(0.7, 0.4 * _count_matching(_AUTONOMY_RES, text, limit=2))
     
     def _track_evaluation(self, action: str, result: Dict[str, Any]):
         """Track evaluation history for analysis and improvement."""
-        evaluations = self.get_state("recent_evaluations") or []
-        
-        # Keep only last 100 evaluations
-        if len(evaluations) >= 100:
-            evaluations = evaluations[-99:]
-        
-        evaluations.append({
+        # The bounded deque drops the oldest entry itself
+        self._recent.append({
             "action": action[:200],  # Truncate for storage
             "compliant": result["compliant"],
             "confidence": result["confidence"],
@@ -221,11 +294,30 @@ class DeonticRuleContract(BaseSmartContract):
             "timestamp": self.deployed_at
         })
         
-        self.update_state("recent_evaluations", evaluations)
+        self._unflushed_evaluations += 1
+        if self._unflushed_evaluations >= RECENT_EVALUATIONS_FLUSH_EVERY:
+            self._flush_recent_evaluations()
     
-    def get_applicable_rules(self) -> List[Dict[str, Any]]:
-        """Return all deontological rules this contract can evaluate."""
-        return [
+    def _flush_recent_evaluations(self):
+        """Write the in-memory evaluation history to contract state."""
+        self.update_state("recent_evaluations", list(self._recent))
+        self._unflushed_evaluations = 0
+    
+    def get_full_state(self) -> Dict[str, Any]:
+        """Get the complete internal state, including any unflushed evaluations."""
+        if self._unflushed_evaluations:
+            self._flush_recent_evaluations()
+        return super().get_full_state()
+    
+    def reset_state(self):
+        """Reset the contract's internal state and evaluation history."""
+        self._recent.clear()
+        self._unflushed_evaluations = 0
+        super().reset_state()
+    
+    def _build_applicable_rules(self):
+        """Build the public rule summaries once; they only change with ``self.rules``."""
+        self._applicable_rules = tuple(
             {
                 "rule_id": rule_data["rule_id"],
                 "rule_name": rule_data["rule_name"],
@@ -234,31 +326,38 @@ class DeonticRuleContract(BaseSmartContract):
                 "universalizability_test": rule_data["universalizability_test"]
             }
             for rule_data in self.rules.values()
-        ]
+        )
+    
+    def get_applicable_rules(self) -> List[Dict[str, Any]]:
+        """Return all deontological rules this contract can evaluate (shared, read-only dicts)."""
+        return list(self._applicable_rules)
     
     def get_rule_statistics(self) -> Dict[str, Any]:
         """Get statistics about rule evaluations."""
-        evaluations = self.get_state("recent_evaluations") or []
+        evaluations = self._recent
         
         if not evaluations:
             return {"total_evaluations": 0, "compliance_rate": 0.0}
         
+        # Tally compliance, violations by rule and confidence in one pass
         total = len(evaluations)
-        compliant = sum(1 for e in evaluations if e["compliant"])
-        
-        # Count violations by rule
+        compliant = 0
+        confidence_sum = 0.0
         rule_violations = {}
         for evaluation in evaluations:
-            if not evaluation["compliant"]:
+            if evaluation["compliant"]:
+                compliant += 1
+            else:
                 rule = evaluation["rule_applied"]
                 rule_violations[rule] = rule_violations.get(rule, 0) + 1
+            confidence_sum += evaluation["confidence"]
         
         return {
             "total_evaluations": total,
             "compliance_rate": compliant / total,
             "violation_count": total - compliant,
             "rule_violations": rule_violations,
-            "average_confidence": sum(e["confidence"] for e in evaluations) / total
+            "average_confidence": confidence_sum / total
         }
     
     def check_universalizability(self, maxim: str) -> Dict[str, Any]:
@@ -270,16 +369,10 @@ class DeonticRuleContract(BaseSmartContract):
         maxim = self._sanitize_text_input(maxim, max_length=500)
         
         # Simple heuristic-based universalizability test
-        contradictory_patterns = [
-            r"only.*(?:i|me|myself)",
-            r"nobody.*else",
-            r"except.*(?:me|myself)",
-            r"when.*(?:convenient|beneficial).*to.*me"
-        ]
-        
+        maxim_lower = maxim.lower()
         contradiction_score = 0.0
-        for pattern in contradictory_patterns:
-            if re.search(pattern, maxim.lower(), re.IGNORECASE):
+        for pattern in _CONTRADICTION_RES:
+            if pattern.search(maxim_lower):
                 contradiction_score += 0.3
         
         universalizable = contradiction_score < 0.4